@@ -11,15 +11,52 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Optional read replica for read-only dependencies; a client's reads stay on the primary
+    # for REPLICA_STICKY_SECONDS after a write request (it echoes the X-Last-Write header)
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_STICKY_SECONDS: int = 5
+    # Async engine URL; derived from DATABASE_URL (asyncpg / aiosqlite) when unset
+    DATABASE_ASYNC_URL: str | None = None
+    # Connection profile. DB_MAX_CONNECTIONS is what the whole app may open on the primary:
+    # each of WEB_CONCURRENCY worker processes gets an equal share, split between the sync
+    # engine and the async engine (DB_ASYNC_POOL_SHARE of it). The replica is a separate
+    # server with its own DB_REPLICA_MAX_CONNECTIONS, shared the same way by the workers.
+    # Each pool keeps two thirds of its share open and allows the rest as overflow;
+    # DB_POOL_SIZE / DB_MAX_OVERFLOW override the sync primary pool only.
+    WEB_CONCURRENCY: int = 1
+    DB_MAX_CONNECTIONS: int = 30
+    DB_ASYNC_POOL_SHARE: float = 0.25
+    DB_REPLICA_MAX_CONNECTIONS: int = 30
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECT_TIMEOUT_SECONDS: int = 10
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Log database sessions slower than this (0 disables), sampling that fraction of them
+    DB_SLOW_SESSION_MS: int = 500
+    DB_SLOW_SESSION_LOG_SAMPLE_RATE: float = 1.0
+    # Apply pending migrations when the app starts (single-process dev setups); otherwise run `python migrate.py`
+    MIGRATE_ON_STARTUP: bool = False
     
     # Security
     JWT_SECRET: str | None = None
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    ADMIN_CACHE_TTL_SECONDS: int = 60
+    ADMIN_CACHE_MAX_ENTRIES: int = 1024
+    SUBSCRIPTION_CACHE_TTL_SECONDS: int = 60
+    SUBSCRIPTION_CACHE_MAX_ENTRIES: int = 1024
     
-    # Rate limiting
+    # Rate limiting (login attempts per second, per username and per client IP)
     RATE_LIMIT_PER_SECOND: int = 10
+
+    # Password hashing: bcrypt cost (older hashes are upgraded on login) and the bounded
+    # pool it runs on; beyond PASSWORD_HASH_MAX_PENDING queued checks, logins get a 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
     
     # Admin bootstrap - only used for initial setup
     ADMIN_USERNAME: str | None = None
@@ -40,6 +77,21 @@ class Settings(BaseSettings):
         "http://127.0.0.1:8080",
     ]
 
+    # Read /subject-grades/averages from the materialized subject_grade_summaries table
+    GRADE_SUMMARY_ENABLED: bool = False
+
+    # PDF generation jobs (0 workers renders inline, e.g. for tests)
+    PDF_JOB_WORKERS: int = 2
+    PDF_JOB_MAX_ATTEMPTS: int = 3
+    # Jobs pending/running without a dispatch for this long are resumed at startup
+    PDF_JOB_STALE_SECONDS: int = 600
+
+    # Report charts
+    CHART_CACHE_SIZE: int = 64
+
+    # Seconds /reports/statistics/summary is served from cache (0 disables)
+    REPORT_SUMMARY_TTL_SECONDS: int = 30
+
     # Storage base
     STORAGE_DIR: str = "storage"
     
@@ -58,11 +110,47 @@ class Settings(BaseSettings):
     def REPORTS_DIR(self) -> str:
         return os.path.join(self.STORAGE_DIR, "reports")
     
+    @computed_field
+    @property
+    def TIMETABLE_CACHE_DIR(self) -> str:
+        return os.path.join(self.REPORTS_DIR, "timetables")
+    
     @computed_field
     @property
     def DOCUMENTS_DIR(self) -> str:
         return os.path.join(self.STORAGE_DIR, "documents")
     
+    def get_pool_limits(self, role: str = "sync") -> tuple[int, int]:
+        """(pool_size, max_overflow) of one worker's ``sync``, ``async`` or ``replica`` engine"""
+        workers = max(1, self.WEB_CONCURRENCY)
+        if role == "replica":
+            budget = max(1, self.DB_REPLICA_MAX_CONNECTIONS // workers)
+        else:
+            per_worker = max(1, self.DB_MAX_CONNECTIONS // workers)
+            async_budget = min(per_worker - 1, int(per_worker * self.DB_ASYNC_POOL_SHARE))
+            budget = max(1, async_budget) if role == "async" else per_worker - async_budget
+        pool_size = max(1, budget * 2 // 3)
+        max_overflow = max(0, budget - pool_size)
+        if role == "sync":
+            if self.DB_POOL_SIZE is not None:
+                pool_size = self.DB_POOL_SIZE
+                max_overflow = max(0, budget - pool_size)
+            if self.DB_MAX_OVERFLOW is not None:
+                max_overflow = self.DB_MAX_OVERFLOW
+        return pool_size, max_overflow
+
+    def get_connection_options(self) -> dict[str, str]:
+        """PostgreSQL settings sent with the connection startup packet"""
+        options = {"timezone": "UTC", "statement_timeout": str(self.DB_STATEMENT_TIMEOUT_MS)}
+        if self.ENVIRONMENT == "production":
+            options.update({
+                "work_mem": "16MB",
+                "maintenance_work_mem": "128MB",
+                "random_page_cost": "1.1",  # Assuming SSD storage
+                "effective_cache_size": "4GB",  # Adjust based on available memory
+            })
+        return options
+
     def get_jwt_secret(self) -> str:
         if not self.JWT_SECRET:
             if self.ENVIRONMENT == "production":
@@ -102,3 +190,4 @@ os.makedirs(settings.STORAGE_DIR, exist_ok=True)
 os.makedirs(settings.RECEIPTS_DIR, exist_ok=True)
 os.makedirs(settings.REPORTS_DIR, exist_ok=True)
 os.makedirs(settings.DOCUMENTS_DIR, exist_ok=True)
+os.makedirs(settings.TIMETABLE_CACHE_DIR, exist_ok=True)
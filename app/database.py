@@ -1,14 +1,17 @@
-from sqlalchemy import create_engine, event, text
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from .config import settings
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import logging
+import random
 import time
 from functools import wraps
-import contextlib
+from threading import Lock
 
 # Configure logging with more detailed format
 logging.basicConfig(
@@ -40,22 +43,39 @@ def retry_on_exception(retries=3, delay=1):
         return wrapper
     return decorator
 
-# Configure database engine with basic settings
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10,
-    echo=False,  # Log all SQL in debug mode
-    connect_args={
-        "connect_timeout": 10,
-        "application_name": "edumanage",
-        "keepalives": 1,
-        "keepalives_idle": 60,
-        "keepalives_interval": 10,
-        "keepalives_count": 5
+def engine_options(url: str, role: str = "sync") -> dict:
+    """Pool and connect arguments from the connection profile in Settings (``role`` picks the pool budget)"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return {}
+    pool_size, max_overflow = settings.get_pool_limits(role)
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
     }
-)
+    server_settings = settings.get_connection_options()
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+            "server_settings": {"application_name": "edumanage", **server_settings},
+        }
+    else:
+        # libpq applies these at connection startup: no SET round-trips per new connection
+        options["connect_args"] = {
+            "connect_timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+            "application_name": "edumanage",
+            "options": " ".join(f"-c {name}={value}" for name, value in server_settings.items()),
+            "keepalives": 1,
+            "keepalives_idle": 60,
+            "keepalives_interval": 10,
+            "keepalives_count": 5,
+        }
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, echo=False, **engine_options(settings.DATABASE_URL))
 
 # Configure session with performance optimizations
 SessionLocal = sessionmaker(
@@ -66,204 +86,228 @@ SessionLocal = sessionmaker(
     twophase=False  # Disable distributed transactions for better performance
 )
 
-Base = declarative_base()
-from app.models import models
 
-# Auto-migration function to fix schema issues
-def auto_migrate_database():
-    """Automatically fix database schema issues on startup with proper transaction handling"""
+def _read_only(bind: Engine) -> Engine:
+    # psycopg2 begins transactions on these connections with BEGIN READ ONLY
+    return bind.execution_options(postgresql_readonly=True) if bind.dialect.name == "postgresql" else bind
+
+
+# Optional streaming replica for dashboards, reports and exports
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, echo=False, **engine_options(settings.DATABASE_REPLICA_URL, "replica"))
+    if settings.DATABASE_REPLICA_URL else None
+)
+_primary_read_engine = _read_only(engine)
+_replica_read_engine = _read_only(replica_engine) if replica_engine is not None else _primary_read_engine
+
+
+# Read-your-writes travels with the client: responses to requests that may write carry the
+# server time in this header, the client echoes its latest value, and reads stay on the
+# primary while it is younger than REPLICA_STICKY_SECONDS. Works across workers and hosts.
+LAST_WRITE_HEADER = "X-Last-Write"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _mark_client_write(request: Request | None, response: Response | None) -> None:
+    # Set before the handler runs: headers added after a yield dependency resumes are not sent
+    if replica_engine is None or request is None or response is None or request.method in SAFE_METHODS:
+        return
+    response.headers[LAST_WRITE_HEADER] = f"{time.time():.3f}"
+
+
+def _client_wrote_recently(request: Request | None) -> bool:
+    if request is None:
+        return False
     try:
-        # Use autocommit mode to avoid transaction issues
-        with engine.connect() as conn:
-            # Set autocommit mode to handle each statement independently
-            conn = conn.execution_options(autocommit=True)
-            
-            logger.info("Starting database schema migration...")
-            
-            # First, ensure institution_settings table exists
-            try:
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS institution_settings (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR,
-                        address VARCHAR,
-                        phone VARCHAR,
-                        email VARCHAR
-                    )
-                """))
-                logger.info("✓ Base institution_settings table ensured")
-            except Exception as e:
-                logger.warning(f"Table creation warning: {e}")
-            
-            # Add missing columns one by one with individual transaction handling
-            columns_to_add = [
-                ("language", "VARCHAR"),
-                ("time_zone", "VARCHAR"),
-                ("dark_mode", "BOOLEAN DEFAULT FALSE"),
-                ("font_size", "VARCHAR"),
-                ("auto_print", "BOOLEAN DEFAULT FALSE"),
-                ("logo_data_url", "TEXT"),
-                ("location", "VARCHAR"),
-                ("logo_path", "VARCHAR"),
-                ("academic_year", "INTEGER"),
-                ("current_semester", "VARCHAR"),
-                ("grading_scale", "JSONB"),
-                ("attendance_types", "JSONB"),
-                ("payment_methods", "JSONB"),
-                ("document_types", "JSONB"),
-                ("event_types", "JSONB"),
-                ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-            ]
-            
-            for column_name, column_type in columns_to_add:
-                try:
-                    # Check if column exists by querying information_schema
-                    result = conn.execute(text("""
-                        SELECT column_name 
-                        FROM information_schema.columns 
-                        WHERE table_name = 'institution_settings' 
-                        AND column_name = :column_name
-                    """), {"column_name": column_name})
-                    
-                    if result.fetchone() is None:
-                        # Column doesn't exist, add it
-                        conn.execute(text(f"ALTER TABLE institution_settings ADD COLUMN {column_name} {column_type}"))
-                        logger.info(f"✓ Added column {column_name}")
-                    else:
-                        logger.debug(f"✓ Column {column_name} already exists")
-                        
-                except Exception as add_error:
-                    logger.warning(f"Could not add column {column_name}: {add_error}")
-                    # Continue with next column instead of failing completely
-                    continue
-            
-            logger.info("✓ Institution settings schema migration completed")
-            
-            # Create categories table if it doesn't exist
-            try:
-                conn.execute(text("SELECT COUNT(*) FROM categories LIMIT 1"))
-                logger.info("Categories table exists")
-            except Exception:
-                logger.info("Creating categories table...")
-                
-                # Create categories table
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS categories (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR NOT NULL UNIQUE,
-                        description TEXT,
-                        color VARCHAR DEFAULT '#3B82F6',
-                        icon VARCHAR DEFAULT 'BookOpen',
-                        order_index INTEGER DEFAULT 0,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """))
-                
-                # Insert default categories
-                conn.execute(text("""
-                    INSERT INTO categories (name, description, color, icon, order_index) VALUES
-                    ('Standard Education', 'Traditional academic education levels', '#3B82F6', 'GraduationCap', 1),
-                    ('Professional Training', 'Professional and vocational training programs', '#10B981', 'Briefcase', 2),
-                    ('Language Learning', 'Language courses and certifications', '#F59E0B', 'Globe', 3),
-                    ('Arts & Music', 'Creative arts and music education', '#8B5CF6', 'Music', 4)
-                    ON CONFLICT (name) DO NOTHING
-                """))
-                
-                conn.commit()
-                logger.info("✓ Created categories table with default data")
-            
-            # Update education_levels table to support category_id
-            try:
-                conn.execute(text("SELECT category_id FROM education_levels LIMIT 1"))
-                logger.info("Education levels table is up to date")
-            except Exception:
-                logger.info("Updating education_levels table...")
-                
-                # Add new columns to education_levels
-                new_columns = [
-                    "ALTER TABLE education_levels ADD COLUMN IF NOT EXISTS category_id INTEGER DEFAULT 1",
-                    "ALTER TABLE education_levels ADD COLUMN IF NOT EXISTS min_age INTEGER",
-                    "ALTER TABLE education_levels ADD COLUMN IF NOT EXISTS max_age INTEGER",
-                    "ALTER TABLE education_levels ADD COLUMN IF NOT EXISTS prerequisites TEXT"
-                ]
-                
-                for sql in new_columns:
-                    try:
-                        conn.execute(text(sql))
-                    except Exception as col_error:
-                        logger.debug(f"Column might already exist: {col_error}")
-                
-                # Update existing levels to use category_id = 1 (Standard Education)
-                conn.execute(text("""
-                    UPDATE education_levels 
-                    SET category_id = 1 
-                    WHERE category_id IS NULL OR category_id = 0
-                """))
-                
-                conn.commit()
-                logger.info("✓ Updated education_levels table schema")
-                
-    except Exception as e:
-        logger.error(f"Auto-migration failed: {e}")
-
-# Run auto-migration and then create all tables
-auto_migrate_database()
-Base.metadata.create_all(bind=engine)
-
-# Connection monitoring
-@event.listens_for(engine, "checkout")
-def receive_checkout(dbapi_connection, connection_record, connection_proxy):
-    logger.debug("Connection checked out from pool")
-
-@event.listens_for(engine, "checkin")
-def receive_checkin(dbapi_connection, connection_record):
-    logger.debug("Connection checked in to pool")
-
-# Set PostgreSQL specific configurations
-@event.listens_for(Engine, "connect")
-def set_pg_settings(dbapi_connection, connection_record):
-    with contextlib.closing(dbapi_connection.cursor()) as cursor:
-        # Performance and timeout settings
-        cursor.execute("SET timezone TO 'UTC';")
-        cursor.execute("SET statement_timeout TO '30000';")  # 30 second query timeout
-        if settings.ENVIRONMENT == "production":
-            # Production-specific optimizations
-            cursor.execute("SET work_mem TO '16MB';")
-            cursor.execute("SET maintenance_work_mem TO '128MB';")
-            cursor.execute("SET random_page_cost TO 1.1;")  # Assuming SSD storage
-            cursor.execute("SET effective_cache_size TO '4GB';")  # Adjust based on available memory
-        
-        # Session-level statistics
-        cursor.execute("SET track_activities TO on;")
-        cursor.execute("SET track_counts TO on;")
-
-# Enhanced database dependency with logging, retries, and error handling
-def get_db() -> Generator:
+        last_write = float(request.headers.get(LAST_WRITE_HEADER, ""))
+    except ValueError:
+        return False
+    return abs(time.time() - last_write) < settings.REPLICA_STICKY_SECONDS
+
+
+class RoutingSession(Session):
+    """Reads go to the replica; flushes, DML and sticky clients go to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or (clause is not None and not getattr(clause, "is_select", False)):
+            return engine
+        if self.info.get("use_primary"):
+            return _primary_read_engine
+        return _replica_read_engine
+
+
+# Read-only sessions outside a request (e.g. streamed exports); lag-tolerant, so always the replica
+ReadOnlySessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=_replica_read_engine,
+    expire_on_commit=False,
+)
+
+RoutingSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+Base = declarative_base()
+
+# Async drivers used by the async engine, per backend
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """``url`` with its driver swapped for the backend's async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker | None = None
+_async_lock = Lock()
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Async session factory, built on first use so workers that never need it skip the driver import"""
+    global _async_engine, _async_session_factory
+    with _async_lock:
+        if _async_session_factory is None:
+            url = settings.DATABASE_ASYNC_URL or async_database_url(settings.DATABASE_URL)
+            _async_engine = create_async_engine(url, **engine_options(url, "async"))
+            pool_metrics.watch(_async_engine.sync_engine, "async")
+            _async_session_factory = async_sessionmaker(
+                _async_engine,
+                autoflush=False,
+                expire_on_commit=False,  # handlers read attributes after commit without awaiting a refresh
+            )
+        return _async_session_factory
+
+# Schema changes are applied out-of-band by the versioned runner in app/migrations.py
+# (`python migrate.py`); app startup only checks the recorded version.
+
+class PoolMetrics:
+    """Pool event counters, aggregated instead of logged per event"""
+
+    EVENTS = ("connects", "checkouts", "checkins", "invalidations")
+
+    def __init__(self):
+        self._counts = dict.fromkeys(self.EVENTS, 0)
+        self._engines: dict[str, Engine] = {}
+        self._lock = Lock()
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def watch(self, bind: Engine, name: str) -> None:
+        """Count ``bind``'s pool events and report its pool as ``name``"""
+        event.listen(bind, "connect", lambda *args: self.incr("connects"))
+        event.listen(bind, "checkout", lambda *args: self.incr("checkouts"))
+        event.listen(bind, "checkin", lambda *args: self.incr("checkins"))
+        event.listen(bind, "invalidate", lambda *args: self.incr("invalidations"))
+        with self._lock:
+            self._engines[name] = bind
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            engines = dict(self._engines)
+        pools = {}
+        for name, bind in engines.items():
+            pool = bind.pool
+            if isinstance(pool, QueuePool):
+                pools[name] = {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+        counts["pools"] = pools
+        return counts
+
+
+pool_metrics = PoolMetrics()
+pool_metrics.watch(engine, "primary")
+if replica_engine is not None:
+    pool_metrics.watch(replica_engine, "replica")
+
+# Sessions that run DML outside the unit of work (session.execute(update(...)), upserts)
+@event.listens_for(Session, "do_orm_execute")
+def _mark_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["writes"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["writes"] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_writes(session, transaction):
+    # Only the outermost transaction ends the writes; SAVEPOINTs come and go inside it
+    if transaction.parent is None:
+        session.info.pop("writes", None)
+
+
+def _has_writes(db) -> bool:
+    return bool(db.new or db.dirty or db.deleted or db.info.get("writes"))
+
+
+def _log_if_slow(started: float, kind: str):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if 0 < settings.DB_SLOW_SESSION_MS <= elapsed_ms and random.random() < settings.DB_SLOW_SESSION_LOG_SAMPLE_RATE:
+        logger.warning("Slow %s database session: %.0fms", kind, elapsed_ms)
+
+
+# Request session: commits only when something was written; reads end with the pool's reset
+def get_db(request: Request = None, response: Response = None) -> Generator:
+    _mark_client_write(request, response)
     db = SessionLocal()
-    start_time = time.time()
-    request_id = id(db)  # Unique identifier for this session
-    
-    logger.info("Starting database session %s", request_id)
-    
+    started = time.perf_counter()
     try:
         yield db
-        db.commit()  # Auto-commit successful transactions
-        duration = time.time() - start_time
-        logger.info("Database session %s completed successfully in %.2fs", request_id, duration)
-    
-    except SQLAlchemyError as e:
-        db.rollback()
-        duration = time.time() - start_time
-        logger.error("Database session %s failed after %.2fs: %s", request_id, duration, str(e))
+        if _has_writes(db):
+            db.commit()
+    except HTTPException:
+        db.rollback()  # an expected client error (404, 401, ...), not a database failure
         raise
-    
     except Exception as e:
         db.rollback()
-        duration = time.time() - start_time
-        logger.error("Unexpected error in session %s after %.2fs: %s", request_id, duration, str(e))
+        logger.error("Database session failed after %.2fs: %s", time.perf_counter() - started, str(e))
         raise
-    
     finally:
         db.close()
-        logger.debug("Database session %s resources released", request_id)
+        _log_if_slow(started, "read-write")
+
+
+# Read-only request session: never commits; served by the replica unless the client just wrote
+def get_read_db(request: Request = None) -> Generator:
+    db = RoutingSessionLocal()
+    db.info["use_primary"] = _client_wrote_recently(request)
+    started = time.perf_counter()
+    try:
+        yield db
+    finally:
+        db.close()
+        _log_if_slow(started, "read-only")
+
+
+# Async variant for async def handlers: awaits the driver instead of blocking the event loop
+async def get_async_db(request: Request = None, response: Response = None) -> AsyncGenerator[AsyncSession, None]:
+    _mark_client_write(request, response)
+    started = time.perf_counter()
+    try:
+        async with get_async_sessionmaker()() as db:
+            try:
+                yield db
+                if _has_writes(db.sync_session):
+                    await db.commit()
+            except HTTPException:
+                await db.rollback()
+                raise
+            except Exception as e:
+                await db.rollback()
+                logger.error("Async database session failed: %s", str(e))
+                raise
+    finally:
+        _log_if_slow(started, "async")
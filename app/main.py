@@ -12,13 +12,11 @@ import logging
 from typing import Callable
 
 from .config import settings
-from .database import Base, engine, SessionLocal
+from .database import engine, SessionLocal, pool_metrics
+from .migrations import check_schema_version, run_migrations
 from .models.models import Admin
 from .utils.auth import pwd_context
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -93,7 +91,7 @@ async def health_check():
         db = SessionLocal()
         db.execute(text("SELECT 1"))
         db.close()
-        return {"status": "healthy", "database": "connected"}
+        return {"status": "healthy", "database": "connected", "pool": pool_metrics.snapshot()}
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         return JSONResponse(
@@ -121,6 +119,8 @@ from .routes.system import router as system_router
 from .routes.settings import router as settings_router
 from .routes.subscriptions import router as subscriptions_router
 from .routes.levels import router as levels_router
+from .routes.jobs import router as jobs_router
+from .routes.export import router as export_router
 
 # Include all routes with API version prefix
 app.include_router(auth_router)
@@ -142,3 +142,35 @@ app.include_router(system_router)
 app.include_router(settings_router)
 app.include_router(subscriptions_router)
 app.include_router(levels_router)
+app.include_router(jobs_router)
+app.include_router(export_router)
+
+
+@app.on_event("startup")
+def check_database_schema():
+    if settings.MIGRATE_ON_STARTUP:
+        applied = run_migrations(engine)
+        if applied:
+            logger.info(f"Applied migrations {applied}")
+    version = check_schema_version(engine)
+    logger.info(f"Database schema at version {version}")
+
+
+@app.on_event("startup")
+def resume_pdf_jobs():
+    from .services.pdf_jobs import PdfJobService
+    db = SessionLocal()
+    try:
+        resumed = PdfJobService.resume_unfinished(db)
+        if resumed:
+            logger.info(f"Resumed {resumed} unfinished PDF jobs")
+    except Exception as e:
+        logger.error(f"Could not resume PDF jobs: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def stop_pdf_jobs():
+    from .services.pdf_jobs import PdfJobService
+    PdfJobService.shutdown()
@@ -0,0 +1,240 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once, in its own transaction, and records its version in
+the ``schema_version`` table. Run them out-of-band with ``python migrate.py``;
+app startup only compares the recorded version with ``LATEST_VERSION``.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from .models import models
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock so concurrent runners apply migrations one at a time
+MIGRATION_LOCK_KEY = 724115
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _add_missing_columns(conn: Connection, table: Table, column_names: List[str], legacy_ddl: Optional[Dict[str, str]] = None) -> List[str]:
+    """Add each listed column missing from the database table, from ``legacy_ddl`` or else the model"""
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    added = []
+    for name in column_names:
+        if name in existing:
+            continue
+        if legacy_ddl and name in legacy_ddl:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {legacy_ddl[name]}"))
+            added.append(name)
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+        if column.server_default is not None:
+            ddl += f" DEFAULT {column.server_default.arg}"
+        conn.execute(text(ddl))
+        added.append(name)
+    return added
+
+
+INSTITUTION_SETTINGS_LEGACY_DDL = {
+    "language": "VARCHAR",
+    "time_zone": "VARCHAR",
+    "dark_mode": "BOOLEAN DEFAULT FALSE",
+    "font_size": "VARCHAR",
+    "auto_print": "BOOLEAN DEFAULT FALSE",
+    "logo_data_url": "TEXT",
+    "location": "VARCHAR",
+    "logo_path": "VARCHAR",
+    "academic_year": "INTEGER",
+    "current_semester": "VARCHAR",
+    "grading_scale": "JSONB",
+    "attendance_types": "JSONB",
+    "payment_methods": "JSONB",
+    "document_types": "JSONB",
+    "event_types": "JSONB",
+    "updated_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+}
+
+
+def _baseline(conn: Connection):
+    """Tables from the models plus the fixes the old startup auto-migration applied"""
+    had_categories = inspect(conn).has_table("categories")
+    models.Base.metadata.create_all(bind=conn, checkfirst=True)
+
+    # Same column definitions as the old startup auto-migration (PostgreSQL DDL), so upgraded databases match
+    legacy_ddl = INSTITUTION_SETTINGS_LEGACY_DDL if conn.dialect.name == "postgresql" else None
+    _add_missing_columns(conn, models.InstitutionSettings.__table__, list(INSTITUTION_SETTINGS_LEGACY_DDL),
+                         legacy_ddl=legacy_ddl)
+
+    if not had_categories:
+        conn.execute(text("""
+            INSERT INTO categories (name, description, color, icon, order_index, is_active) VALUES
+            ('Standard Education', 'Traditional academic education levels', '#3B82F6', 'GraduationCap', 1, TRUE),
+            ('Professional Training', 'Professional and vocational training programs', '#10B981', 'Briefcase', 2, TRUE),
+            ('Language Learning', 'Language courses and certifications', '#F59E0B', 'Globe', 3, TRUE),
+            ('Arts & Music', 'Creative arts and music education', '#8B5CF6', 'Music', 4, TRUE)
+            ON CONFLICT (name) DO NOTHING
+        """))
+
+    added = _add_missing_columns(conn, models.EducationLevel.__table__, ["category_id", "min_age", "max_age", "prerequisites"])
+    if "category_id" in added:
+        conn.execute(text("UPDATE education_levels SET category_id = 1 WHERE category_id IS NULL OR category_id = 0"))
+
+
+def _upsert_unique_keys(conn: Connection):
+    """Unique keys backing the bulk upsert endpoints and the statistics recompute"""
+    unique_keys = [
+        ("uq_student_grades_key", "student_grades", ["student_id", "subject", "exam_name", "semester"]),
+        ("uq_exam_results_exam_student", "exam_results", ["exam_id", "student_id"]),
+        ("uq_teacher_statistics_teacher", "teacher_statistics", ["teacher_id"]),
+    ]
+    inspector = inspect(conn)
+    for index_name, table_name, key_columns in unique_keys:
+        names = {i["name"] for i in inspector.get_indexes(table_name)}
+        names |= {c["name"] for c in inspector.get_unique_constraints(table_name)}
+        if index_name in names:
+            continue
+        # Keep only the latest row for each key before enforcing uniqueness
+        same_key = " AND ".join(f"b.{c} = {table_name}.{c}" for c in key_columns)
+        conn.execute(text(
+            f"DELETE FROM {table_name} WHERE EXISTS "
+            f"(SELECT 1 FROM {table_name} b WHERE {same_key} AND b.id > {table_name}.id)"
+        ))
+        conn.execute(text(f"CREATE UNIQUE INDEX {index_name} ON {table_name} ({', '.join(key_columns)})"))
+
+
+def _teacher_statistics_sums(conn: Connection):
+    """Running feedback sums/counts for incremental teacher statistics"""
+    _add_missing_columns(conn, models.TeacherStatistics.__table__, [
+        "rating_sum", "satisfaction_sum", "satisfaction_count", "teaching_quality_sum", "teaching_quality_count",
+        "course_content_sum", "course_content_count", "communication_sum", "communication_count",
+        "helpfulness_sum", "helpfulness_count",
+    ])
+
+
+def _nullable_file_paths(conn: Connection):
+    """Reports and documents are stored before their PDF job has run"""
+    if conn.dialect.name != "postgresql":
+        return  # tables created from the current models are already nullable
+    for table_name in ("reports", "documents"):
+        conn.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN file_path DROP NOT NULL"))
+
+
+def _model_indexes(conn: Connection):
+    """Secondary indexes declared on the models (composite hot-path indexes included)"""
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _seed_usage_counters(conn: Connection):
+    """Seed usage counters from the usage_metrics history (current billing period only)"""
+    conn.execute(text("""
+        INSERT INTO usage_counters (subscription_id, metric_type, value, period_start, updated_at)
+        SELECT s.id, m.metric_type, SUM(m.quantity),
+               CASE WHEN s.current_period_end IS NOT NULL THEN s.current_period_start END,
+               CURRENT_TIMESTAMP
+        FROM subscriptions s
+        JOIN usage_metrics m ON m.subscription_id = s.id
+        WHERE s.current_period_start IS NULL OR s.current_period_end IS NULL
+           OR m.timestamp BETWEEN s.current_period_start AND s.current_period_end
+        GROUP BY s.id, m.metric_type, s.current_period_start, s.current_period_end
+        ON CONFLICT (subscription_id, metric_type) DO NOTHING
+    """))
+
+
+def _pdf_job_claims(conn: Connection):
+    """Owner and heartbeat used to claim interrupted PDF jobs exactly once"""
+    _add_missing_columns(conn, models.PdfJob.__table__, ["owner", "heartbeat_at"])
+
+
+# Append new migrations at the end; never renumber or edit one that has shipped
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", _baseline),
+    Migration(2, "upsert unique keys", _upsert_unique_keys),
+    Migration(3, "teacher statistics running sums", _teacher_statistics_sums),
+    Migration(4, "nullable report/document file paths", _nullable_file_paths),
+    Migration(5, "hot-path indexes", _model_indexes),
+    Migration(6, "seed usage counters", _seed_usage_counters),
+    Migration(7, "pdf job owner and heartbeat", _pdf_job_claims),
+    Migration(8, "exam date index", _model_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    """Highest applied migration, 0 for a database that was never migrated"""
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        conn.rollback()  # no schema_version table yet
+        return 0
+
+
+def check_schema_version(engine: Engine) -> int:
+    """Raise if the database is behind this code; costs a single query"""
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, this release needs {LATEST_VERSION}; "
+            f"run `python migrate.py` first"
+        )
+    return version
+
+
+def run_migrations(engine: Engine, target: Optional[int] = None, progress: Optional[Callable[[Migration], None]] = None) -> List[int]:
+    """Apply pending migrations up to ``target`` (default: all); returns the versions applied"""
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    with engine.connect() as conn:
+        is_postgres = conn.dialect.name == "postgresql"
+        if is_postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+        try:
+            with conn.begin():
+                schema_version.create(bind=conn, checkfirst=True)
+                # Read under the lock so migrations applied by a concurrent runner are skipped
+                version = current_version(conn)
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+                with conn.begin():
+                    migration.apply(conn)
+                    conn.execute(schema_version.insert().values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.utcnow(),
+                    ))
+                logger.info("Applied migration %s: %s", migration.version, migration.description)
+                applied.append(migration.version)
+                if progress:
+                    progress(migration)
+        finally:
+            if is_postgres:
+                conn.rollback()  # a failed migration leaves its transaction open
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                conn.commit()
+    return applied
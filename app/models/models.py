@@ -1,5 +1,5 @@
 from datetime import datetime, date, time
-from sqlalchemy import Boolean, Column, Integer, String, Text, Float, ForeignKey, DateTime, Date, Time, JSON, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Text, Float, ForeignKey, DateTime, Date, Time, JSON, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -30,6 +30,9 @@ class SubscriptionPlan(Base):
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index("ix_subscriptions_admin_status", "admin_id", "status"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     admin_id = Column(Integer, ForeignKey("admins.id"), nullable=False)
     plan_id = Column(Integer, ForeignKey("subscription_plans.id"), nullable=False)
@@ -61,6 +64,9 @@ class SubscriptionInvoice(Base):
 
 class UsageMetrics(Base):
     __tablename__ = "usage_metrics"
+    __table_args__ = (
+        Index("ix_usage_metrics_subscription_metric_ts", "subscription_id", "metric_type", "timestamp"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     subscription_id = Column(Integer, ForeignKey("subscriptions.id"), nullable=False)
     metric_type = Column(String, nullable=False)  # students, teachers, courses, etc.
@@ -69,6 +75,19 @@ class UsageMetrics(Base):
 
     subscription = relationship("Subscription", backref="usage_metrics")
 
+class UsageCounter(Base):
+    """Running usage per subscription and metric for the current billing period"""
+    __tablename__ = "usage_counters"
+    __table_args__ = (
+        UniqueConstraint("subscription_id", "metric_type", name="uq_usage_counters_key"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id"), nullable=False)
+    metric_type = Column(String, nullable=False)
+    value = Column(Integer, nullable=False, default=0)
+    period_start = Column(DateTime, nullable=True)  # NULL when the subscription has no billing period
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Group(Base):
     __tablename__ = "groups"
     id = Column(Integer, primary_key=True, index=True)
@@ -148,6 +167,9 @@ class Course(Base):
 
 class Exam(Base):
     __tablename__ = "exams"
+    __table_args__ = (
+        Index("ix_exams_exam_date", "exam_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
@@ -160,6 +182,10 @@ class Exam(Base):
 
 class ExamResult(Base):
     __tablename__ = "exam_results"
+    __table_args__ = (
+        # Upsert key for /exams/{exam_id}/results
+        UniqueConstraint("exam_id", "student_id", name="uq_exam_results_exam_student"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -170,6 +196,9 @@ class ExamResult(Base):
 
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        Index("ix_attendance_student_date", "student_id", "date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     date = Column(Date, nullable=False)
@@ -179,6 +208,9 @@ class Attendance(Base):
 
 class Timetable(Base):
     __tablename__ = "timetable"
+    __table_args__ = (
+        Index("ix_timetable_group_day", "group_id", "day_of_week"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
     day_of_week = Column(Integer, nullable=False)  # 1=Monday, 7=Sunday
@@ -190,6 +222,9 @@ class Timetable(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_status", "status"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
     amount = Column(Float, nullable=False)
@@ -202,11 +237,14 @@ class Payment(Base):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("ix_reports_created_at", "created_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String(50), nullable=False)
     period_start = Column(Date, nullable=True)
     period_end = Column(Date, nullable=True)
-    file_path = Column(String(255), nullable=False)
+    file_path = Column(String(255), nullable=True)  # NULL while the PDF job is pending
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class Document(Base):
@@ -214,13 +252,29 @@ class Document(Base):
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String(50), nullable=False)  # certificate/report_card/absence_excuse
     student_id = Column(Integer, ForeignKey("students.id", ondelete="SET NULL"), nullable=True)
-    file_path = Column(String(255), nullable=False)
+    file_path = Column(String(255), nullable=True)  # NULL while the PDF job is pending
     signed = Column(Boolean, default=False)
     meta = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     student = relationship("Student")
 
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # receipt/report/timetable/document
+    target_id = Column(Integer, nullable=True)  # payment/report/document receiving the file path
+    status = Column(String(10), nullable=False, default="pending")  # pending/running/done/failed
+    params = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    result_path = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+    owner = Column(String(100), nullable=True)  # host:pid of the process that dispatched the job
+    heartbeat_at = Column(DateTime, nullable=True)  # last enqueue/dispatch; stale jobs are resumed
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Event(Base):
     __tablename__ = "events"
     id = Column(Integer, primary_key=True, index=True)
@@ -242,6 +296,11 @@ class Subject(Base):
 
 class StudentGrade(Base):
     __tablename__ = "student_grades"
+    __table_args__ = (
+        # Upsert key for /subject-grades/bulk
+        UniqueConstraint("student_id", "subject", "exam_name", "semester", name="uq_student_grades_key"),
+        Index("ix_student_grades_group_subject_semester", "group_id", "subject", "semester"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
@@ -252,8 +311,26 @@ class StudentGrade(Base):
     semester = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class SubjectGradeSummary(Base):
+    """Per student/subject/semester grade average, maintained on grade writes"""
+    __tablename__ = "subject_grade_summaries"
+    __table_args__ = (
+        UniqueConstraint("group_id", "student_id", "semester", "subject", name="uq_subject_grade_summaries_key"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    semester = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    average = Column(Float, nullable=False)
+    coefficient = Column(Float, nullable=False)
+    grade_count = Column(Integer, nullable=False)
+
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        Index("ix_feedback_teacher_id", "teacher_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=True)
@@ -295,6 +372,10 @@ class InstitutionSettings(Base):
 
 class TeacherStatistics(Base):
     __tablename__ = "teacher_statistics"
+    __table_args__ = (
+        # Upsert key for the bulk statistics recompute
+        UniqueConstraint("teacher_id", name="uq_teacher_statistics_teacher"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False)
     total_students = Column(Integer, default=0)
@@ -309,6 +390,18 @@ class TeacherStatistics(Base):
     helpfulness_rating = Column(Float, default=0.0)
     attendance_rate = Column(Float, default=0.0)
     grade_improvement = Column(Float, default=0.0)
+    # Running feedback sums/counts, updated from feedback deltas (NULL until the first full recompute)
+    rating_sum = Column(Float, nullable=True)
+    satisfaction_sum = Column(Float, nullable=True)
+    satisfaction_count = Column(Integer, nullable=True)
+    teaching_quality_sum = Column(Float, nullable=True)
+    teaching_quality_count = Column(Integer, nullable=True)
+    course_content_sum = Column(Float, nullable=True)
+    course_content_count = Column(Integer, nullable=True)
+    communication_sum = Column(Float, nullable=True)
+    communication_count = Column(Integer, nullable=True)
+    helpfulness_sum = Column(Float, nullable=True)
+    helpfulness_count = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 
 from ..database import get_db
-from ..models.models import Attendance
+from ..models.models import Attendance, Student
 from ..schemas import AttendanceCreate, AttendanceRead, AttendanceUpdate
 from ..utils.auth import get_current_admin
+from ..utils.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/attendance", tags=["attendance"], dependencies=[Depends(get_current_admin)])
 
 
 @router.get("/", response_model=List[AttendanceRead])
-def list_attendance(db: Session = Depends(get_db)):
-    return db.query(Attendance).order_by(Attendance.id.desc()).all()
+def list_attendance(
+    response: Response,
+    page: PageParams = Depends(),
+    student_id: Optional[int] = Query(None),
+    group_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    q = db.query(Attendance)
+    if student_id is not None:
+        q = q.filter(Attendance.student_id == student_id)
+    if group_id is not None:
+        q = q.join(Student, Student.id == Attendance.student_id).filter(Student.group_id == group_id)
+    if status:
+        q = q.filter(Attendance.status == status)
+    if date_from:
+        q = q.filter(Attendance.date >= date_from)
+    if date_to:
+        q = q.filter(Attendance.date <= date_to)
+    return paginate(q, Attendance.id, page, response)
 
 
 @router.post("/", response_model=AttendanceRead)
@@ -1,22 +1,38 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..models.models import Admin
 from ..schemas import Token, LoginResponse, ChangePasswordRequest, RegisterRequest
-from ..utils.auth import verify_password, hash_password, create_access_token, get_current_admin, pwd_context
+from ..utils.auth import (
+    check_login_rate, create_access_token, get_current_admin, hash_password_pooled, invalidate_admin_cache,
+    submit_password_task, verify_password, verify_password_async, verify_password_pooled,
+)
 from ..config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    admin = db.query(Admin).filter(Admin.username == form_data.username).first()
-    if not admin or not verify_password(form_data.password, admin.hashed_password):
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    check_login_rate(form_data.username, request.client.host if request.client else None)
+    admin = (await db.scalars(select(Admin).where(Admin.username == form_data.username).limit(1))).first()
+    if not admin:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
+    valid, new_hash = await verify_password_async(form_data.password, admin.hashed_password)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
+    if new_hash:
+        admin.hashed_password = new_hash  # committed by get_async_db
+        invalidate_admin_cache(admin.username)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     token = create_access_token(subject=admin.username, expires_delta=access_token_expires)
     return LoginResponse(access_token=token, username=admin.username)
@@ -31,7 +47,7 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
     # Create new admin
     admin = Admin(
         username=payload.username,
-        hashed_password=hash_password(payload.password),
+        hashed_password=hash_password_pooled(payload.password),
     )
     db.add(admin)
     db.commit()
@@ -47,11 +63,14 @@ def change_password(
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin),
 ):
-    if not verify_password(payload.old_password, current_admin.hashed_password):
+    if not verify_password_pooled(payload.old_password, current_admin.hashed_password):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Old password is incorrect")
-    current_admin.hashed_password = hash_password(payload.new_password)
-    db.add(current_admin)
+    # current_admin may be a cached snapshot; write through a row owned by this session
+    admin = db.get(Admin, current_admin.id)
+    admin.hashed_password = hash_password_pooled(payload.new_password)
+    db.add(admin)
     db.commit()
+    invalidate_admin_cache(current_admin.username)
     token = create_access_token(subject=current_admin.username)
     return Token(access_token=token)
 
@@ -78,6 +97,8 @@ def debug_admin_status(db: Session = Depends(get_db)):
                 "password": settings.ADMIN_PASSWORD
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
 
@@ -86,19 +107,18 @@ def debug_admin_status(db: Session = Depends(get_db)):
 def reset_admin_user(db: Session = Depends(get_db)):
     """Debug endpoint to reset admin user with default credentials"""
     try:
-        from ..utils.auth import pwd_context
-        
         # Delete existing admin users
         db.query(Admin).delete()
         
         # Create new admin with default credentials
-        hashed_password = pwd_context.hash(settings.ADMIN_PASSWORD)
+        hashed_password = hash_password_pooled(settings.ADMIN_PASSWORD)
         admin = Admin(
             username=settings.ADMIN_USERNAME,
             hashed_password=hashed_password
         )
         db.add(admin)
         db.commit()
+        invalidate_admin_cache()
         
         return {
             "message": "Admin user reset successfully",
@@ -106,6 +126,8 @@ def reset_admin_user(db: Session = Depends(get_db)):
             "password": settings.ADMIN_PASSWORD,
             "status": "success"
         }
+    except HTTPException:
+        raise  # e.g. 503 when the password hash pool is full
     except Exception as e:
         db.rollback()
         return {"error": str(e), "status": "failed"}
@@ -115,13 +137,11 @@ def reset_admin_user(db: Session = Depends(get_db)):
 def test_login_credentials(db: Session = Depends(get_db)):
     """Test login with default credentials"""
     try:
-        from ..utils.auth import verify_password
-        
         admin = db.query(Admin).filter(Admin.username == settings.ADMIN_USERNAME).first()
         if not admin:
             return {"error": "Admin user not found", "status": "no_admin"}
         
-        password_valid = verify_password(settings.ADMIN_PASSWORD, admin.hashed_password)
+        password_valid = verify_password_pooled(settings.ADMIN_PASSWORD, admin.hashed_password)
         
         return {
             "admin_exists": True,
@@ -130,6 +150,8 @@ def test_login_credentials(db: Session = Depends(get_db)):
             "expected_password": settings.ADMIN_PASSWORD,
             "status": "success" if password_valid else "invalid_password"
         }
+    except HTTPException:
+        raise  # e.g. 503 when the password hash pool is full
     except Exception as e:
         return {"error": str(e), "status": "error"}
 
@@ -159,14 +181,14 @@ def list_all_users(db: Session = Depends(get_db)):
 
 
 @router.post("/debug/test-password")
-def test_password_hash(payload: dict, db: Session = Depends(get_db)):
+def test_password_hash(payload: dict, request: Request, db: Session = Depends(get_db)):
     """Test password hashing and verification"""
+    username = payload.get("username", "")
+    password = payload.get("password", "")
+    if username:
+        # Each call runs several bcrypt checks, so it is throttled like a login
+        check_login_rate(username, request.client.host if request.client else None)
     try:
-        from ..utils.auth import pwd_context, verify_password
-        
-        username = payload.get("username", "")
-        password = payload.get("password", "")
-        
         if not username or not password:
             return {"error": "Username and password required", "status": "error"}
         
@@ -175,10 +197,7 @@ def test_password_hash(payload: dict, db: Session = Depends(get_db)):
         if not admin:
             return {"error": f"User '{username}' not found", "status": "user_not_found"}
         
-        # Test password verification
-        password_valid = verify_password(password, admin.hashed_password)
-        
-        # Also test with common password variations
+        # Test the password and common variations, each distinct candidate checked once on the bcrypt pool
         test_passwords = [
             password,
             password.lower(),
@@ -188,10 +207,12 @@ def test_password_hash(payload: dict, db: Session = Depends(get_db)):
             "Admin123",
             "ADMIN123"
         ]
-        
-        test_results = {}
-        for test_pwd in test_passwords:
-            test_results[test_pwd] = verify_password(test_pwd, admin.hashed_password)
+        pending = {
+            test_pwd: submit_password_task(verify_password, test_pwd, admin.hashed_password)
+            for test_pwd in dict.fromkeys(test_passwords)
+        }
+        test_results = {test_pwd: future.result() for test_pwd, future in pending.items()}
+        password_valid = test_results[password]
         
         return {
             "username": username,
@@ -201,5 +222,7 @@ def test_password_hash(payload: dict, db: Session = Depends(get_db)):
             "test_results": test_results,
             "status": "tested"
         }
+    except HTTPException:
+        raise  # e.g. 503 when the password hash pool is full
     except Exception as e:
         return {"error": str(e), "status": "error"}
@@ -17,26 +17,20 @@ def list_courses(db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=CourseRead)
-async def create_course(
+def create_course(
     payload: CourseCreate,
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
-    # Check if creating a new course is allowed under current subscription
+    # Count the course against the subscription limit in the same transaction as the insert;
+    # the usage counter rejects it atomically if the limit is reached
     from ..services.usage import UsageService
-    if not await UsageService.check_limit(db, admin.id, "courses"):
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot create new course: Would exceed subscription limit"
-        )
+    UsageService.reserve_usage(db, admin.id, "courses")
 
     obj = Course(**payload.dict())
     db.add(obj)
     db.commit()
     db.refresh(obj)
-
-    # Track the usage
-    await UsageService.track_usage(db, admin.id, "courses")
     return obj
 
 
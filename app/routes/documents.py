@@ -6,7 +6,7 @@ from ..database import get_db
 from ..models.models import Document, Student
 from ..schemas import DocumentCreate, DocumentRead, DocumentUpdate
 from ..utils.auth import get_current_admin
-from ..utils.pdf_generator import generate_document_pdf
+from ..services.pdf_jobs import PdfJobService
 
 router = APIRouter(prefix="/documents", tags=["documents"], dependencies=[Depends(get_current_admin)])
 
@@ -25,11 +25,18 @@ def generate_document(payload: DocumentCreate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Student not found")
         student_name = student.full_name
 
-    file_path = generate_document_pdf(doc_type=payload.type, student_name=student_name, meta=payload.meta, signed=payload.signed)
-    record = Document(type=payload.type, student_id=payload.student_id, file_path=file_path, signed=payload.signed, meta=payload.meta)
+    record = Document(type=payload.type, student_id=payload.student_id, signed=payload.signed, meta=payload.meta)
     db.add(record)
     db.commit()
     db.refresh(record)
+
+    job = PdfJobService.enqueue(db, "document", {
+        'doc_type': payload.type,
+        'student_name': student_name,
+        'meta': payload.meta,
+        'signed': payload.signed,
+    }, target_id=record.id)
+    record.job_id = job.id
     return record
 
 
@@ -6,6 +6,7 @@ from ..database import get_db
 from ..models.models import Exam, ExamResult, Student
 from ..schemas import ExamCreate, ExamRead, ExamUpdate, ExamResultRead, RecordResultsRequest
 from ..utils.auth import get_current_admin
+from ..utils.upsert import upsert_returning
 
 router = APIRouter(prefix="/exams", tags=["exams"], dependencies=[Depends(get_current_admin)])
 
@@ -60,23 +61,19 @@ def record_results(exam_id: int, payload: RecordResultsRequest, db: Session = De
     exam = db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
-    saved: List[ExamResult] = []
-    for r in payload.results:
-        # optional: ensure student exists
-        student = db.get(Student, r.student_id)
-        if not student:
-            raise HTTPException(status_code=400, detail=f"Student {r.student_id} not found")
-        # upsert by (exam_id, student_id)
-        existing = db.query(ExamResult).filter(ExamResult.exam_id == exam_id, ExamResult.student_id == r.student_id).first()
-        if existing:
-            existing.score = r.score
-            db.add(existing)
-            saved.append(existing)
-        else:
-            er = ExamResult(exam_id=exam_id, student_id=r.student_id, score=r.score)
-            db.add(er)
-            saved.append(er)
+    if not payload.results:
+        return []
+
+    # Ensure every student exists with a single IN query
+    student_ids = {r.student_id for r in payload.results}
+    found = {sid for (sid,) in db.query(Student.id).filter(Student.id.in_(student_ids))}
+    missing = student_ids - found
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Student {min(missing)} not found")
+
+    # upsert by (exam_id, student_id); a later entry for the same student wins
+    scores = {r.student_id: r.score for r in payload.results}
+    rows = [{"exam_id": exam_id, "student_id": sid, "score": score} for sid, score in scores.items()]
+    saved = upsert_returning(db, ExamResult, rows, index_elements=("exam_id", "student_id"), update_columns=("score",))
     db.commit()
-    for s in saved:
-        db.refresh(s)
     return saved
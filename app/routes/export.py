@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..database import ReadOnlySessionLocal
+from ..models.models import Student, Payment, Attendance, StudentGrade
+from ..utils.auth import get_current_admin
+from ..utils.export import EXPORT_MEDIA_TYPES, iter_export, gzip_chunks
+
+router = APIRouter(prefix="/export", tags=["export"], dependencies=[Depends(get_current_admin)])
+
+EXPORT_ENTITIES = {
+    "students": Student,
+    "payments": Payment,
+    "attendance": Attendance,
+    "grades": StudentGrade,
+}
+
+
+def _stream(model, fmt: str, compress: bool):
+    # The request session is closed before the body is streamed, so the export owns its own
+    db = ReadOnlySessionLocal()
+    try:
+        chunks = iter_export(db, model, fmt)
+        yield from (gzip_chunks(chunks) if compress else chunks)
+    finally:
+        db.close()
+
+
+@router.get("/{entity}")
+def export_entity(
+    entity: str,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Return a gzip-compressed file"),
+):
+    """Stream every row of a table as CSV or NDJSON"""
+    model = EXPORT_ENTITIES.get(entity)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export entity: {entity}")
+
+    filename = f"{entity}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        _stream(model, fmt, gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
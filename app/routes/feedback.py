@@ -5,7 +5,7 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.models import Feedback, Student, Teacher, Course
 from ..utils.auth import get_current_admin
 from ..services.teacher_stats_service import TeacherStatsService
@@ -127,30 +127,36 @@ def create_feedback(
         if existing_feedback:
             print(f"Updating existing feedback with ID {existing_feedback.id}")
             # Update existing feedback
+            previous = TeacherStatsService.feedback_metrics(existing_feedback)
             for field, value in feedback.dict().items():
                 setattr(existing_feedback, field, value)
             existing_feedback.updated_at = datetime.utcnow()
+            db.flush()
+            
+            # Fold the change into the teacher statistics in the same transaction
+            TeacherStatsService.apply_feedback_delta(
+                db, feedback.teacher_id, previous, TeacherStatsService.feedback_metrics(existing_feedback)
+            )
             db.commit()
             db.refresh(existing_feedback)
             
-            # Update teacher statistics
-            TeacherStatsService.update_teacher_statistics(db, feedback.teacher_id)
-            
             return existing_feedback
         
         # Create new feedback
         print("Creating new feedback record")
         db_feedback = Feedback(**feedback.dict())
         db.add(db_feedback)
+        db.flush()
+        
+        # Fold the new feedback into the teacher statistics in the same transaction
+        TeacherStatsService.apply_feedback_delta(
+            db, feedback.teacher_id, None, TeacherStatsService.feedback_metrics(db_feedback)
+        )
         db.commit()
         db.refresh(db_feedback)
         
         print(f"Feedback created successfully with ID {db_feedback.id}")
         
-        # Update teacher statistics after creating feedback
-        TeacherStatsService.update_teacher_statistics(db, feedback.teacher_id)
-        print(f"Updated teacher statistics for teacher {feedback.teacher_id}")
-        
         return db_feedback
         
     except HTTPException:
@@ -177,7 +183,7 @@ def list_feedback(
 @router.get("/teacher/{teacher_id}/stats", response_model=TeacherStats)
 def get_teacher_stats(
     teacher_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin = Depends(get_current_admin)
 ):
     """Get aggregated statistics for a teacher"""
@@ -260,6 +266,9 @@ def delete_feedback(
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
+    previous = TeacherStatsService.feedback_metrics(feedback)
     db.delete(feedback)
+    db.flush()
+    TeacherStatsService.apply_feedback_delta(db, feedback.teacher_id, previous, None)
     db.commit()
     return {"ok": True}
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..models.models import Group
 from ..schemas import GroupCreate, GroupRead, GroupUpdate
 from ..utils.auth import get_current_admin
@@ -11,8 +13,8 @@ router = APIRouter(prefix="/groups", tags=["groups"], dependencies=[Depends(get_
 
 
 @router.get("/", response_model=List[GroupRead])
-def list_groups(db: Session = Depends(get_db)):
-    return db.query(Group).order_by(Group.id.desc()).all()
+async def list_groups(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(Group).order_by(Group.id.desc()))).all()
 
 
 @router.post("/", response_model=GroupRead)
@@ -25,8 +27,8 @@ def create_group(payload: GroupCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{group_id}", response_model=GroupRead)
-def get_group(group_id: int, db: Session = Depends(get_db)):
-    obj = db.get(Group, group_id)
+async def get_group(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    obj = await db.get(Group, group_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Group not found")
     return obj
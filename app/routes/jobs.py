@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models.models import PdfJob
+from ..schemas import PdfJobRead
+from ..utils.auth import get_current_admin
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], dependencies=[Depends(get_current_admin)])
+
+
+@router.get("/{job_id}", response_model=PdfJobRead)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Poll the status of a PDF generation job"""
+    obj = db.get(PdfJob, job_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return obj
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
 import os
 
@@ -8,15 +8,36 @@ from ..database import get_db
 from ..models.models import Payment, Student
 from ..schemas import PaymentCreate, PaymentRead, PaymentUpdate
 from ..utils.auth import get_current_admin
-from ..utils.pdf_generator import generate_receipt_pdf
+from ..utils.pagination import PageParams, paginate
+from ..services.pdf_jobs import PdfJobService
 from ..config import settings
 
 router = APIRouter(prefix="/payments", tags=["payments"], dependencies=[Depends(get_current_admin)])
 
 
 @router.get("/", response_model=List[PaymentRead])
-def list_payments(db: Session = Depends(get_db)):
-    return db.query(Payment).order_by(Payment.id.desc()).all()
+def list_payments(
+    response: Response,
+    page: PageParams = Depends(),
+    student_id: Optional[int] = Query(None),
+    group_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    q = db.query(Payment)
+    if student_id is not None:
+        q = q.filter(Payment.student_id == student_id)
+    if group_id is not None:
+        q = q.join(Student, Student.id == Payment.student_id).filter(Student.group_id == group_id)
+    if status:
+        q = q.filter(Payment.status == status)
+    if date_from:
+        q = q.filter(Payment.date >= date_from)
+    if date_to:
+        q = q.filter(Payment.date <= date_to)
+    return paginate(q, Payment.id, page, response)
 
 
 @router.post("/", response_model=PaymentRead)
@@ -26,21 +47,21 @@ def create_payment(payload: PaymentCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(obj)
 
-    # Generate receipt PDF only when status is paid
+    # Queue receipt PDF generation only when status is paid
     if (obj.status or '').lower() == 'paid':
         student = db.get(Student, obj.student_id)
         if not student:
             raise HTTPException(status_code=400, detail="Student not found for payment")
-        receipt_path = generate_receipt_pdf(student_name=student.full_name, payment={
-            'id': obj.id,
-            'amount': obj.amount,
-            'date': obj.date,
-            'method': obj.method,
-        })
-        obj.receipt_path = receipt_path
-        db.add(obj)
-        db.commit()
-        db.refresh(obj)
+        job = PdfJobService.enqueue(db, "receipt", {
+            'student_name': student.full_name,
+            'payment': {
+                'id': obj.id,
+                'amount': obj.amount,
+                'date': obj.date.isoformat(),
+                'method': obj.method,
+            },
+        }, target_id=obj.id)
+        obj.job_id = job.id
     return obj
 
 
@@ -4,45 +4,23 @@ from sqlalchemy import func
 from typing import List, Optional
 from datetime import date, datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.models import Report, Payment, ExamResult, Attendance, Student, Teacher, Course, Group
 from ..schemas import ReportCreate, ReportRead
 from ..utils.auth import get_current_admin
-from ..utils.pdf_generator import generate_report_pdf
+from ..services.pdf_jobs import PdfJobService
+from ..services.report_metrics import ReportMetricsService
+from ..services.report_summary import ReportSummaryService
 
 router = APIRouter(prefix="/reports", tags=["reports"], dependencies=[Depends(get_current_admin)])
 
 @router.get("/statistics/summary")
-def get_report_statistics(db: Session = Depends(get_db)):
+def get_report_statistics(db: Session = Depends(get_read_db)):
     """Get summary statistics for the reports dashboard"""
-    # Total reports generated
-    total_reports = db.query(Report).count()
-    
-    # Reports generated today
-    today = datetime.now().date()
-    reports_today = db.query(Report).filter(
-        func.date(Report.created_at) == today
-    ).count()
-    
-    # Pending reports (assuming reports without file_path are pending)
-    pending_reports = db.query(Report).filter(
-        Report.file_path.is_(None)
-    ).count()
-    
-    # Total downloads (estimated)
-    download_count = total_reports * 3
-    
-    return {
-        "reportStats": {
-            "totalReports": total_reports,
-            "generatedToday": reports_today,
-            "pendingReports": pending_reports,
-            "downloadCount": download_count
-        }
-    }
+    return {"reportStats": ReportSummaryService.get(db)}
 
 @router.get("/recent")
-def get_recent_reports(db: Session = Depends(get_db), limit: int = 4):
+def get_recent_reports(db: Session = Depends(get_read_db), limit: int = 4):
     """Get recent reports for the dashboard"""
     items = (
         db.query(Report)
@@ -85,8 +63,23 @@ def get_recent_reports(db: Session = Depends(get_db), limit: int = 4):
 
     return [to_dict(r) for r in items]
 
+@router.get("/metrics/{report_type}")
+def get_report_metrics(
+    report_type: str,
+    period_start: Optional[date] = None,
+    period_end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Report statistics without generating a PDF, for dashboards"""
+    return {
+        "type": report_type,
+        "period_start": period_start,
+        "period_end": period_end,
+        "stats": ReportMetricsService.compute(db, report_type, period_start, period_end),
+    }
+
 @router.get("/", response_model=List[ReportRead])
-def list_reports(db: Session = Depends(get_db)):
+def list_reports(db: Session = Depends(get_read_db)):
     return db.query(Report).order_by(Report.id.desc()).all()
 
 class GenerateReportRequest(ReportCreate):
@@ -96,49 +89,30 @@ class GenerateReportRequest(ReportCreate):
 
 @router.post("/generate", response_model=ReportRead)
 def generate_report(payload: GenerateReportRequest, db: Session = Depends(get_db)):
-    # Compute simple stats from DB as a placeholder
-    stats = {}
-    if payload.type == 'financial':
-        paid_total = (db.query(Payment).filter(Payment.status == 'paid')
-                      .with_entities(Payment.amount).all())
-        paid_sum = sum(a[0] for a in paid_total) if paid_total else 0
-        unpaid_total = (db.query(Payment).filter(Payment.status == 'unpaid')
-                        .with_entities(Payment.amount).all())
-        unpaid_sum = sum(a[0] for a in unpaid_total) if unpaid_total else 0
-        recovery_rate = (paid_sum / (paid_sum + unpaid_sum) * 100) if (paid_sum + unpaid_sum) else 0
-        stats = {
-            'total_revenue': round(paid_sum, 2),
-            'outstanding_balances': round(unpaid_sum, 2),
-            'recovery_rate_percent': round(recovery_rate, 1),
-        }
-    elif payload.type == 'attendance_analysis':
-        total = db.query(Attendance).count()
-        present = db.query(Attendance).filter(Attendance.status == 'present').count()
-        rate = (present / total * 100) if total else 0
-        stats = {'attendance_records': total, 'present_rate_percent': round(rate, 1)}
-    elif payload.type == 'student_performance':
-        scores = db.query(ExamResult).with_entities(ExamResult.score).all()
-        avg = sum(s[0] for s in scores) / len(scores) if scores else 0
-        stats = {'avg_score': round(avg, 2), 'results_count': len(scores)}
-    else:
-        stats = {'note': 'Basic report generated'}
+    stats = ReportMetricsService.compute(db, payload.type, payload.period_start, payload.period_end)
 
     options = {
         'include_graphs': payload.include_graphs,
         'include_detailed_data': payload.include_detailed_data,
         'include_advanced_analysis': payload.include_advanced_analysis,
     }
-    file_path = generate_report_pdf(payload.type, (payload.period_start.isoformat() if payload.period_start else None,
-                                                  payload.period_end.isoformat() if payload.period_end else None),
-                                    options, stats)
-
+    # The report stays pending (file_path NULL) until its PDF job finishes
     record = Report(
         type=payload.type,
         period_start=payload.period_start,
         period_end=payload.period_end,
-        file_path=file_path,
     )
     db.add(record)
     db.commit()
     db.refresh(record)
+    ReportSummaryService.invalidate()
+
+    job = PdfJobService.enqueue(db, "report", {
+        'report_type': payload.type,
+        'period': [payload.period_start.isoformat() if payload.period_start else None,
+                   payload.period_end.isoformat() if payload.period_end else None],
+        'options': options,
+        'stats': stats,
+    }, target_id=record.id)
+    record.job_id = job.id
     return record
@@ -1,49 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..models.models import Student, Admin
 from ..schemas import StudentCreate, StudentRead, StudentUpdate
 from ..utils.auth import get_current_admin
+from ..utils.pagination import PageParams, paginate_async
 from ..services.usage import UsageService
-from ..services.usage import UsageService
+from ..services.student_import import StudentImportService
 
 router = APIRouter(prefix="/students", tags=["students"], dependencies=[Depends(get_current_admin)])
 
 
 @router.get("/", response_model=List[StudentRead])
-def list_students(db: Session = Depends(get_db)):
-    return db.query(Student).order_by(Student.id.desc()).all()
+async def list_students(
+    response: Response,
+    page: PageParams = Depends(),
+    group_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    q = select(Student)
+    if group_id is not None:
+        q = q.where(Student.group_id == group_id)
+    if status:
+        q = q.where(Student.status == status)
+    return await paginate_async(db, q, Student.id, page, response)
 
 
 @router.post("/", response_model=StudentRead)
-async def create_student(
+def create_student(
     payload: StudentCreate,
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
-    # Check if creating a new student is allowed under current subscription
+    # Count the student against the subscription limit in the same transaction as the insert;
+    # the usage counter rejects it atomically if the limit is reached
     from ..services.usage import UsageService
-    if not await UsageService.check_limit(db, admin.id, "students"):
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot create new student: Would exceed subscription limit"
-        )
+    UsageService.reserve_usage(db, admin.id, "students")
 
     obj = Student(**payload.dict())
     db.add(obj)
     db.commit()
     db.refresh(obj)
-
-    # Track the usage
-    await UsageService.track_usage(db, admin.id, "students")
     return obj
 
 
+@router.post("/import")
+def import_students(
+    file: UploadFile = File(..., description="CSV with a header row of student fields"),
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(get_current_admin)
+):
+    """Bulk-create students from a CSV upload; all rows are imported or none"""
+    imported = StudentImportService.import_csv(db, admin.id, file.file)
+    return {"imported": imported}
+
+
 @router.get("/{student_id}", response_model=StudentRead)
-def get_student(student_id: int, db: Session = Depends(get_db)):
-    obj = db.get(Student, student_id)
+async def get_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    obj = await db.get(Student, student_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Student not found")
     return obj
@@ -2,10 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.models import StudentGrade, Student, Group
-from ..schemas import StudentGradeRead, StudentGradesBulk, GroupStudentAverage, SubjectAverage
+from ..schemas import StudentGradeRead, StudentGradesBulk, GroupStudentAverage
 from ..utils.auth import get_current_admin
+from ..utils.upsert import upsert_returning
+from ..services.grade_average_service import GradeAverageService
+
+GRADE_UPSERT_KEY = ("student_id", "subject", "exam_name", "semester")
 
 router = APIRouter(prefix="/subject-grades", tags=["subject_grades"], dependencies=[Depends(get_current_admin)])
 
@@ -15,48 +19,33 @@ def bulk_upsert(payload: StudentGradesBulk, db: Session = Depends(get_db)):
     if not payload.grades:
         return []
 
-    saved: List[StudentGrade] = []
+    # Validate all referenced students and groups with one IN query each
+    student_ids = {item.student_id for item in payload.grades}
+    group_ids = {item.group_id for item in payload.grades}
+    found_students = {sid for (sid,) in db.query(Student.id).filter(Student.id.in_(student_ids))}
+    missing_students = student_ids - found_students
+    if missing_students:
+        raise HTTPException(status_code=400, detail=f"Student {min(missing_students)} not found")
+    found_groups = {gid for (gid,) in db.query(Group.id).filter(Group.id.in_(group_ids))}
+    missing_groups = group_ids - found_groups
+    if missing_groups:
+        raise HTTPException(status_code=400, detail=f"Group {min(missing_groups)} not found")
+
+    # One row per upsert key; a later item in the payload wins
+    rows: Dict[tuple, dict] = {}
     for item in payload.grades:
-        # Validate student and group exist (light validation)
-        student = db.get(Student, item.student_id)
-        if not student:
-            raise HTTPException(status_code=400, detail=f"Student {item.student_id} not found")
-        group = db.get(Group, item.group_id)
-        if not group:
-            raise HTTPException(status_code=400, detail=f"Group {item.group_id} not found")
-
-        existing = (
-            db.query(StudentGrade)
-            .filter(
-                StudentGrade.student_id == item.student_id,
-                StudentGrade.subject == item.subject,
-                StudentGrade.exam_name == item.exam_name,
-                StudentGrade.semester == item.semester,
-            )
-            .first()
-        )
-        if existing:
-            existing.group_id = item.group_id
-            existing.grade = item.grade
-            existing.coefficient = item.coefficient
-            db.add(existing)
-            saved.append(existing)
-        else:
-            row = StudentGrade(
-                student_id=item.student_id,
-                group_id=item.group_id,
-                subject=item.subject,
-                exam_name=item.exam_name,
-                grade=item.grade,
-                coefficient=item.coefficient,
-                semester=item.semester,
-            )
-            db.add(row)
-            saved.append(row)
-
+        key = (item.student_id, item.subject, item.exam_name, item.semester)
+        rows[key] = item.dict()
+
+    saved = upsert_returning(
+        db,
+        StudentGrade,
+        list(rows.values()),
+        index_elements=GRADE_UPSERT_KEY,
+        update_columns=("group_id", "grade", "coefficient"),
+    )
+    GradeAverageService.refresh_summaries(db, student_ids, {item.semester for item in payload.grades})
     db.commit()
-    for s in saved:
-        db.refresh(s)
     return saved
 
 
@@ -110,71 +99,6 @@ def get_by_student(
 def averages_by_group(
     group_id: int = Query(...),
     semester: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    # Load students in the group
-    students: List[Student] = (
-        db.query(Student)
-        .filter(Student.group_id == group_id)
-        .order_by(Student.full_name.asc())
-        .all()
-    )
-
-    # Load all grades for the group and semester
-    rows: List[StudentGrade] = (
-        db.query(StudentGrade)
-        .filter(
-            StudentGrade.group_id == group_id,
-            StudentGrade.semester == semester,
-        )
-        .all()
-    )
-
-    # Build map: student_id -> subject -> { grades: [], coefficient }
-    agg: Dict[int, Dict[str, Dict[str, float | List[float]]]] = {}
-    for r in rows:
-        sid = int(r.student_id)
-        subj = (r.subject or '').strip()
-        if not subj:
-            continue
-        agg.setdefault(sid, {})
-        if subj not in agg[sid]:
-            agg[sid][subj] = {"grades": [], "coefficient": float(r.coefficient or 1.0)}
-        # If coefficient differs across rows we keep the latest non-null
-        if r.coefficient is not None:
-            agg[sid][subj]["coefficient"] = float(r.coefficient)
-        # Append grade
-        try:
-            g = float(r.grade)
-            agg[sid][subj]["grades"].append(g)
-        except Exception:
-            pass
-
-    result: List[GroupStudentAverage] = []
-    for st in students:
-        sid = int(st.id)
-        subjects_info = agg.get(sid, {})
-        subject_entries: List[SubjectAverage] = []
-        weighted_sum = 0.0
-        sum_coeffs = 0.0
-        for subj, info in subjects_info.items():
-            grades = info.get("grades", [])  # type: ignore
-            coeff = float(info.get("coefficient", 1.0))  # type: ignore
-            if not grades:
-                continue
-            avg = sum(grades) / len(grades)
-            subject_entries.append(SubjectAverage(subject=subj, coefficient=coeff, average=avg))
-            weighted_sum += avg * coeff
-            sum_coeffs += coeff
-        avg_val = (weighted_sum / sum_coeffs) if sum_coeffs > 0 else None
-        result.append(
-            GroupStudentAverage(
-                student_id=sid,
-                full_name=st.full_name,
-                average=avg_val,
-                sum_coefficients=sum_coeffs,
-                subjects=subject_entries,
-            )
-        )
-
-    return result
+    return GradeAverageService.averages_by_group(db, group_id, semester)
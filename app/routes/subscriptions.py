@@ -14,6 +14,7 @@ from ..schemas.subscription import (
 )
 from ..utils.auth import get_current_admin
 from ..services.payment import PaymentService
+from ..services.subscription_cache import invalidate_subscription_cache
 
 router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
@@ -47,6 +48,7 @@ def update_subscription_plan(plan_id: int, payload: SubscriptionPlanUpdate, db:
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    invalidate_subscription_cache()  # limits of every subscriber on this plan
     return obj
 
 @router.delete("/plans/{plan_id}", dependencies=[Depends(get_current_admin)])
@@ -57,6 +59,7 @@ def delete_subscription_plan(plan_id: int, db: Session = Depends(get_db)):
     obj.is_active = False
     db.add(obj)
     db.commit()
+    invalidate_subscription_cache()
     return {"ok": True}
 
 # Subscriptions
@@ -97,6 +100,7 @@ async def create_subscription(
     )
     db.add(invoice)
     db.commit()
+    invalidate_subscription_cache(obj.admin_id)
 
     return {
         **obj.__dict__,
@@ -135,6 +139,7 @@ def update_subscription(
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    invalidate_subscription_cache(obj.admin_id)
     return obj
 
 # Payment webhook
@@ -147,7 +152,7 @@ async def stripe_webhook(
     if not stripe_signature:
         raise HTTPException(status_code=400, detail="Missing Stripe signature")
     
-    await PaymentService.handle_webhook_event(payload, stripe_signature)
+    await PaymentService.handle_webhook_event(payload, stripe_signature, db)
     return {"ok": True}
 
 # Subscription Invoices
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, select
 
-from ..database import get_db
+from ..database import get_async_db, get_db, get_read_db
 from ..models.models import Teacher, Student, Group, Course, Attendance, StudentGrade, Feedback, Admin
 from ..schemas import TeacherCreate, TeacherRead, TeacherUpdate, TeacherStats, TeacherGroupInfo
 from ..utils.auth import get_current_admin
@@ -15,37 +16,31 @@ router = APIRouter(prefix="/teachers", tags=["teachers"], dependencies=[Depends(
 
 
 @router.get("/", response_model=List[TeacherRead])
-def list_teachers(db: Session = Depends(get_db)):
-    return db.query(Teacher).order_by(Teacher.id.desc()).all()
+async def list_teachers(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(Teacher).order_by(Teacher.id.desc()))).all()
 
 
 @router.post("/", response_model=TeacherRead)
-async def create_teacher(
+def create_teacher(
     payload: TeacherCreate,
     db: Session = Depends(get_db),
     admin: Admin = Depends(get_current_admin)
 ):
-    # Check if creating a new teacher is allowed under current subscription
+    # Count the teacher against the subscription limit in the same transaction as the insert;
+    # the usage counter rejects it atomically if the limit is reached
     from ..services.usage import UsageService
-    if not await UsageService.check_limit(db, admin.id, "teachers"):
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot create new teacher: Would exceed subscription limit"
-        )
+    UsageService.reserve_usage(db, admin.id, "teachers")
 
     obj = Teacher(**payload.dict())
     db.add(obj)
     db.commit()
     db.refresh(obj)
-
-    # Track the usage
-    await UsageService.track_usage(db, admin.id, "teachers")
     return obj
 
 
 @router.get("/{teacher_id}", response_model=TeacherRead)
-def get_teacher(teacher_id: int, db: Session = Depends(get_db)):
-    obj = db.get(Teacher, teacher_id)
+async def get_teacher(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+    obj = await db.get(Teacher, teacher_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Teacher not found")
     return obj
@@ -99,7 +94,7 @@ def get_teacher_stats(teacher_id: int, db: Session = Depends(get_db), current_ad
 
 
 @router.get("/stats/overview")
-def get_teachers_overview_stats(db: Session = Depends(get_db), current_admin = Depends(get_current_admin)):
+def get_teachers_overview_stats(db: Session = Depends(get_read_db), current_admin = Depends(get_current_admin)):
     """Get overall statistics for all teachers"""
     try:
         from datetime import datetime, timedelta
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from fastapi.responses import FileResponse
 
 from ..database import get_db
 from ..models.models import Timetable, Group, Course, Teacher
-from ..schemas import TimetableCreate, TimetableRead, TimetableUpdate
+from ..schemas import TimetableCreate, TimetableRead, TimetableUpdate, PdfJobRead
 from ..utils.auth import get_current_admin
-from ..utils.pdf_generator import generate_group_timetable_pdf
+from ..services.pdf_jobs import PdfJobService
+from ..services.timetable_pdf_cache import TimetablePdfCache
 
 router = APIRouter(prefix="/timetable", tags=["timetable"], dependencies=[Depends(get_current_admin)])
 
@@ -31,33 +32,82 @@ def get_group_timetable(group_id: int, db: Session = Depends(get_db)):
     ).order_by(Timetable.day_of_week, Timetable.start_time).all()
 
 
+def _timetable_pdf_rows(db: Session, group_ids: List[int]) -> dict[int, list[dict]]:
+    """Timetable rows with course names for the given groups, loaded in one joined query"""
+    entries = db.query(
+        Timetable.group_id,
+        Timetable.day_of_week,
+        Timetable.start_time,
+        Timetable.end_time,
+        Course.name.label("course_name"),
+    ).outerjoin(
+        Course, Course.id == Timetable.course_id
+    ).filter(
+        Timetable.group_id.in_(group_ids)
+    ).order_by(Timetable.group_id, Timetable.day_of_week, Timetable.start_time).all()
+
+    rows: dict[int, list[dict]] = {}
+    for entry in entries:
+        rows.setdefault(entry.group_id, []).append({
+            "day": entry.day_of_week,
+            "start": entry.start_time.strftime("%H:%M"),
+            "end": entry.end_time.strftime("%H:%M"),
+            "course": entry.course_name or "",
+        })
+    return rows
+
+
+@router.get("/all/pdf")
+def get_all_timetables_pdf_route(
+    background: bool = Query(False, description="Queue a PDF job and return it instead of the file"),
+    db: Session = Depends(get_db),
+):
+    """Generate a single PDF with the timetable of every group, one group per page"""
+    groups = db.query(Group.id, Group.name).order_by(Group.name, Group.id).all()
+    rows_by_group = _timetable_pdf_rows(db, [g.id for g in groups])
+    params = {
+        "groups": [
+            {"group_name": g.name, "rows": rows_by_group.get(g.id, [])}
+            for g in groups
+        ]
+    }
+
+    if background:
+        job = PdfJobService.enqueue(db, "timetables", params)
+        return PdfJobRead.model_validate(job)
+
+    from ..utils.pdf_generator import generate_all_timetables_pdf  # ReportLab loads on first render
+    pdf_path = generate_all_timetables_pdf(**params)
+    return FileResponse(pdf_path, media_type='application/pdf', filename="timetables.pdf")
+
+
 @router.get("/group/{group_id}/pdf")
-def get_group_timetable_pdf_route(group_id: int, db: Session = Depends(get_db)):
+def get_group_timetable_pdf_route(
+    group_id: int,
+    request: Request,
+    background: bool = Query(False, description="Queue a PDF job and return it instead of the file"),
+    db: Session = Depends(get_db),
+):
     """Generate and return a PDF timetable for a specific group"""
     group = db.get(Group, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    timetable_entries = db.query(Timetable).filter(
-        Timetable.group_id == group_id
-    ).order_by(Timetable.day_of_week, Timetable.start_time).all()
+    rows = _timetable_pdf_rows(db, [group_id]).get(group_id, [])
 
-    rows = []
-    for entry in timetable_entries:
-        course_name = ""
-        if entry.course_id:
-            course = db.get(Course, entry.course_id)
-            if course:
-                course_name = course.name
-        rows.append({
-            "day": entry.day_of_week,
-            "start": entry.start_time.strftime("%H:%M"),
-            "end": entry.end_time.strftime("%H:%M"),
-            "course": course_name,
-        })
+    if background:
+        job = PdfJobService.enqueue(db, "timetable", {"group_name": group.name, "rows": rows})
+        return PdfJobRead.model_validate(job)
+
+    key = TimetablePdfCache.key(group.name, rows)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
 
-    pdf_path = generate_group_timetable_pdf(group.name, rows)
-    return FileResponse(pdf_path, media_type='application/pdf', filename=f"timetable_{group.name}.pdf")
+    pdf_path = TimetablePdfCache.get_or_create(group.id, group.name, rows, key)
+    return FileResponse(pdf_path, media_type='application/pdf', filename=f"timetable_{group.name}.pdf", headers=headers)
 
 
 @router.post("/", response_model=TimetableRead)
@@ -92,6 +142,7 @@ def create_timetable_entry(payload: TimetableCreate, db: Session = Depends(get_d
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    TimetablePdfCache.invalidate(obj.group_id)
     return obj
 
 
@@ -145,12 +196,16 @@ def update_timetable_entry(timetable_id: int, payload: TimetableUpdate, db: Sess
                 detail="Time conflict with existing timetable entry"
             )
     
+    old_group_id = obj.group_id
     for k, v in update_data.items():
         setattr(obj, k, v)
     
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    TimetablePdfCache.invalidate(old_group_id)
+    if obj.group_id != old_group_id:
+        TimetablePdfCache.invalidate(obj.group_id)
     return obj
 
 
@@ -161,8 +216,10 @@ def delete_timetable_entry(timetable_id: int, db: Session = Depends(get_db)):
     if not obj:
         raise HTTPException(status_code=404, detail="Timetable entry not found")
     
+    group_id = obj.group_id
     db.delete(obj)
     db.commit()
+    TimetablePdfCache.invalidate(group_id)
     return {"message": "Timetable entry deleted successfully"}
 
 
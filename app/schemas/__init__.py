@@ -227,6 +227,7 @@ class PaymentUpdate(BaseModel):
 class PaymentRead(PaymentBase):
     id: int
     receipt_path: Optional[str] = None
+    job_id: Optional[int] = None  # receipt PDF job, set on creation
     model_config = {"from_attributes": True}
 
 
@@ -240,7 +241,8 @@ class ReportCreate(ReportBase):
 
 class ReportRead(ReportBase):
     id: int
-    file_path: str
+    file_path: Optional[str] = None
+    job_id: Optional[int] = None
     created_at: datetime
     model_config = {"from_attributes": True}
 
@@ -260,11 +262,25 @@ class DocumentUpdate(BaseModel):
 
 class DocumentRead(DocumentBase):
     id: int
-    file_path: str
+    file_path: Optional[str] = None
+    job_id: Optional[int] = None
     created_at: datetime
     model_config = {"from_attributes": True}
 
 
+class PdfJobRead(BaseModel):
+    id: int
+    kind: str
+    target_id: Optional[int] = None
+    status: str
+    attempts: int
+    result_path: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    model_config = {"from_attributes": True}
+
+
 class EventBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -0,0 +1,133 @@
+from typing import Iterable, List, Optional
+from sqlalchemy import func, select, delete, insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.models import Student, StudentGrade, SubjectGradeSummary
+from ..schemas import GroupStudentAverage, SubjectAverage
+
+
+class GradeAverageService:
+    """Service computing subject and coefficient-weighted grade averages in SQL"""
+
+    @staticmethod
+    def subject_averages(
+        group_id: Optional[int] = None,
+        semester: Optional[str] = None,
+        student_ids: Optional[Iterable[int]] = None,
+        semesters: Optional[Iterable[str]] = None,
+    ):
+        """Build a SELECT of AVG(grade) and coefficient per group/student/semester/subject"""
+        subject = func.trim(StudentGrade.subject)
+        query = select(
+            StudentGrade.group_id,
+            StudentGrade.student_id,
+            StudentGrade.semester,
+            subject.label("subject"),
+            func.avg(StudentGrade.grade).label("average"),
+            func.max(StudentGrade.coefficient).label("coefficient"),
+            func.count(StudentGrade.id).label("grade_count"),
+        ).where(subject != "")
+
+        if group_id is not None:
+            query = query.where(StudentGrade.group_id == group_id)
+        if semester is not None:
+            query = query.where(StudentGrade.semester == semester)
+        if student_ids is not None:
+            query = query.where(StudentGrade.student_id.in_(list(student_ids)))
+        if semesters is not None:
+            query = query.where(StudentGrade.semester.in_(list(semesters)))
+
+        return query.group_by(
+            StudentGrade.group_id,
+            StudentGrade.student_id,
+            StudentGrade.semester,
+            subject,
+        )
+
+    @staticmethod
+    def averages_by_group(db: Session, group_id: int, semester: str) -> List[GroupStudentAverage]:
+        """Per-student weighted averages for a group and semester in a single query"""
+        if settings.GRADE_SUMMARY_ENABLED:
+            per_subject = select(
+                SubjectGradeSummary.student_id,
+                SubjectGradeSummary.subject,
+                SubjectGradeSummary.average,
+                SubjectGradeSummary.coefficient,
+            ).where(
+                SubjectGradeSummary.group_id == group_id,
+                SubjectGradeSummary.semester == semester,
+            ).subquery()
+        else:
+            per_subject = GradeAverageService.subject_averages(group_id=group_id, semester=semester).subquery()
+
+        rows = db.execute(
+            select(
+                Student.id,
+                Student.full_name,
+                per_subject.c.subject,
+                per_subject.c.average,
+                per_subject.c.coefficient,
+                func.sum(per_subject.c.average * per_subject.c.coefficient)
+                .over(partition_by=Student.id).label("weighted_sum"),
+                func.sum(per_subject.c.coefficient)
+                .over(partition_by=Student.id).label("sum_coefficients"),
+            )
+            .select_from(Student)
+            .outerjoin(per_subject, per_subject.c.student_id == Student.id)
+            .where(Student.group_id == group_id)
+            .order_by(Student.full_name.asc(), Student.id.asc(), per_subject.c.subject.asc())
+        ).all()
+
+        result: List[GroupStudentAverage] = []
+        for row in rows:
+            if not result or result[-1].student_id != row.id:
+                sum_coeffs = float(row.sum_coefficients or 0.0)
+                result.append(
+                    GroupStudentAverage(
+                        student_id=row.id,
+                        full_name=row.full_name,
+                        average=(float(row.weighted_sum) / sum_coeffs) if sum_coeffs > 0 else None,
+                        sum_coefficients=sum_coeffs,
+                        subjects=[],
+                    )
+                )
+            if row.subject is not None:
+                result[-1].subjects.append(
+                    SubjectAverage(
+                        subject=row.subject,
+                        coefficient=float(row.coefficient),
+                        average=float(row.average),
+                    )
+                )
+        return result
+
+    @staticmethod
+    def _write_summaries(db: Session, source) -> None:
+        columns = ["group_id", "student_id", "semester", "subject", "average", "coefficient", "grade_count"]
+        db.execute(insert(SubjectGradeSummary).from_select(columns, source))
+
+    @staticmethod
+    def refresh_summaries(db: Session, student_ids: Iterable[int], semesters: Iterable[str]) -> None:
+        """Recompute materialized summaries touched by a grade write (no-op when disabled)"""
+        if not settings.GRADE_SUMMARY_ENABLED:
+            return
+        student_ids, semesters = list(student_ids), list(semesters)
+        if not student_ids or not semesters:
+            return
+        db.execute(
+            delete(SubjectGradeSummary).where(
+                SubjectGradeSummary.student_id.in_(student_ids),
+                SubjectGradeSummary.semester.in_(semesters),
+            )
+        )
+        GradeAverageService._write_summaries(
+            db, GradeAverageService.subject_averages(student_ids=student_ids, semesters=semesters)
+        )
+
+    @staticmethod
+    def rebuild_summaries(db: Session) -> None:
+        """Rebuild the whole subject_grade_summaries table from student_grades"""
+        db.execute(delete(SubjectGradeSummary))
+        GradeAverageService._write_summaries(db, GradeAverageService.subject_averages())
+        db.commit()
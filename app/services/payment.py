@@ -3,6 +3,7 @@ import stripe
 from fastapi import HTTPException
 from ..config import settings
 from ..models.models import SubscriptionPlan, Subscription, SubscriptionInvoice
+from .subscription_cache import invalidate_subscription_cache
 from sqlalchemy.orm import Session
 
 # Initialize Stripe with the API key
@@ -110,6 +111,7 @@ class PaymentService:
                     if db_invoice:
                         db_invoice.status = 'paid'
                     db.commit()
+                    invalidate_subscription_cache(subscription.admin_id)
 
             elif event.type == 'invoice.payment_failed':
                 # Handle failed payment
@@ -125,6 +127,7 @@ class PaymentService:
                     if db_invoice:
                         db_invoice.status = 'failed'
                     db.commit()
+                    invalidate_subscription_cache(subscription.admin_id)
 
             elif event.type == 'customer.subscription.deleted':
                 # Handle subscription cancellation
@@ -135,6 +138,7 @@ class PaymentService:
                 if subscription:
                     subscription.status = 'cancelled'
                     db.commit()
+                    invalidate_subscription_cache(subscription.admin_id)
 
             return {'status': 'success'}
 
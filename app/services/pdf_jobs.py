@@ -0,0 +1,216 @@
+import logging
+import os
+import socket
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.models import PdfJob, Payment, Report, Document
+from .report_summary import ReportSummaryService
+
+logger = logging.getLogger(__name__)
+
+# Row and column receiving the rendered file path, per job kind
+JOB_TARGETS = {
+    "receipt": (Payment, "receipt_path"),
+    "report": (Report, "file_path"),
+    "document": (Document, "file_path"),
+}
+
+# Identifies the process that dispatched a job
+JOB_OWNER = f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+# Arbitrary key for pg_try_advisory_xact_lock so only one worker resumes jobs at startup
+RESUME_LOCK_KEY = 724116
+
+
+def render_pdf(kind: str, params: dict) -> str:
+    """Render a job; ReportLab/matplotlib load on first use, in whichever process renders"""
+    from ..utils.pdf_generator import render_pdf as render
+    return render(kind, params)
+
+
+class PdfJobService:
+    """Persisted PDF generation jobs rendered in a process pool"""
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _lock = Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(max_workers=settings.PDF_JOB_WORKERS)
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def _submit(cls, kind: str, params: dict) -> Future:
+        executor = cls._get_executor()
+        try:
+            return executor.submit(render_pdf, kind, params)
+        except BrokenProcessPool:
+            # A worker process died; replace the pool once and resubmit
+            with cls._lock:
+                if cls._executor is executor:
+                    cls._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return cls._get_executor().submit(render_pdf, kind, params)
+
+    @staticmethod
+    def enqueue(db: Session, kind: str, params: dict, target_id: Optional[int] = None) -> PdfJob:
+        """Persist a job and hand it to the worker pool; returns immediately"""
+        job = PdfJob(
+            kind=kind,
+            target_id=target_id,
+            status="pending",
+            params=params,
+            attempts=0,
+            max_attempts=settings.PDF_JOB_MAX_ATTEMPTS,
+            owner=JOB_OWNER,
+            heartbeat_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        PdfJobService._dispatch(db, job)
+        return job
+
+    @staticmethod
+    def _mark_running(job: PdfJob):
+        job.status = "running"
+        job.attempts = (job.attempts or 0) + 1
+        job.owner = JOB_OWNER
+        job.heartbeat_at = datetime.utcnow()
+
+    @staticmethod
+    def _dispatch(db: Session, job: PdfJob):
+        if settings.PDF_JOB_WORKERS <= 0:
+            # Inline mode: render in the calling thread with the caller's session
+            PdfJobService._mark_running(job)
+            db.commit()
+            try:
+                result, error = render_pdf(job.kind, job.params), None
+            except Exception as e:
+                result, error = None, e
+            PdfJobService._record(db, job.id, result, error)
+            return
+
+        job_id = job.id
+        try:
+            future = PdfJobService._submit(job.kind, job.params)
+        except Exception as e:
+            # Pool shut down or broken again: leave the job for the next startup to resume
+            logger.error("Could not submit PDF job %s: %s", job_id, e)
+            job.status = "pending"
+            job.error = f"Could not submit: {e}"
+            job.heartbeat_at = None
+            db.commit()
+            return
+
+        PdfJobService._mark_running(job)
+        try:
+            db.commit()
+        except Exception:
+            future.cancel()
+            raise
+        # Attached after the commit so the result can never be overwritten by the "running" update
+        future.add_done_callback(lambda f: PdfJobService._on_done(job_id, f))
+
+    @staticmethod
+    def _on_done(job_id: int, future: Future):
+        from ..database import SessionLocal
+
+        error = future.exception()
+        result = None if error else future.result()
+        db = SessionLocal()
+        try:
+            PdfJobService._record(db, job_id, result, error)
+        except Exception as e:
+            logger.error("Could not record result of PDF job %s: %s", job_id, e)
+            db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _record(db: Session, job_id: int, result: Optional[str], error: Optional[BaseException]):
+        job = db.get(PdfJob, job_id)
+        if job is None:
+            return
+
+        if error is None:
+            job.status = "done"
+            job.result_path = result
+            job.error = None
+            target = JOB_TARGETS.get(job.kind)
+            if target and job.target_id is not None:
+                model, column = target
+                obj = db.get(model, job.target_id)
+                if obj is not None:
+                    setattr(obj, column, result)
+            db.commit()
+            if job.kind == "report":
+                ReportSummaryService.invalidate()  # the report is no longer pending
+            return
+
+        job.error = str(error)
+        if job.attempts < job.max_attempts:
+            logger.warning("PDF job %s failed (attempt %s), retrying: %s", job.id, job.attempts, error)
+            PdfJobService._dispatch(db, job)
+        else:
+            logger.error("PDF job %s failed after %s attempts: %s", job.id, job.attempts, error)
+            job.status = "failed"
+            db.commit()
+
+    @staticmethod
+    def resume_unfinished(db: Session) -> int:
+        """Claim and re-dispatch jobs whose process stopped before finishing them.
+
+        Only jobs without a dispatch for PDF_JOB_STALE_SECONDS are claimed, so work still
+        running in a live worker is left alone. On PostgreSQL one worker resumes at a time
+        and rows are claimed with FOR UPDATE SKIP LOCKED; attempts are not reset, so a job
+        that keeps killing its worker still stops at max_attempts.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            locked = db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RESUME_LOCK_KEY}).scalar()
+            if not locked:
+                db.rollback()
+                return 0  # another worker is resuming
+
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.PDF_JOB_STALE_SECONDS)
+        stale = (
+            select(PdfJob.id)
+            .where(PdfJob.status.in_(("pending", "running")))
+            .where(or_(PdfJob.heartbeat_at.is_(None), PdfJob.heartbeat_at < cutoff))
+            .with_for_update(skip_locked=True)
+        )
+        claimed = db.execute(
+            update(PdfJob)
+            .where(PdfJob.id.in_(stale))
+            .values(status="running", owner=JOB_OWNER, heartbeat_at=datetime.utcnow())
+            .returning(PdfJob.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+
+        for job_id in claimed:
+            job = db.get(PdfJob, job_id)
+            if job.attempts >= job.max_attempts:
+                logger.error("PDF job %s interrupted after %s attempts, giving up", job.id, job.attempts)
+                job.status = "failed"
+                job.error = job.error or "Interrupted"
+                db.commit()
+                continue
+            PdfJobService._dispatch(db, job)
+        return len(claimed)
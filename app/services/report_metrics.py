@@ -0,0 +1,71 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.models import Payment, Attendance, Exam, ExamResult
+
+
+def _in_period(column, period_start: Optional[date], period_end: Optional[date]) -> list:
+    conditions = []
+    if period_start is not None:
+        conditions.append(column >= period_start)
+    if period_end is not None:
+        conditions.append(column <= period_end)
+    return conditions
+
+
+class ReportMetricsService:
+    """Report statistics, each computed with a single aggregate statement"""
+
+    @staticmethod
+    def financial(db: Session, period_start: Optional[date] = None, period_end: Optional[date] = None) -> dict:
+        row = db.execute(
+            select(
+                func.coalesce(func.sum(Payment.amount).filter(Payment.status == 'paid'), 0).label('paid'),
+                func.coalesce(func.sum(Payment.amount).filter(Payment.status == 'unpaid'), 0).label('unpaid'),
+            ).where(*_in_period(Payment.date, period_start, period_end))
+        ).one()
+        paid_sum, unpaid_sum = float(row.paid), float(row.unpaid)
+        recovery_rate = (paid_sum / (paid_sum + unpaid_sum) * 100) if (paid_sum + unpaid_sum) else 0
+        return {
+            'total_revenue': round(paid_sum, 2),
+            'outstanding_balances': round(unpaid_sum, 2),
+            'recovery_rate_percent': round(recovery_rate, 1),
+        }
+
+    @staticmethod
+    def attendance_analysis(db: Session, period_start: Optional[date] = None, period_end: Optional[date] = None) -> dict:
+        row = db.execute(
+            select(
+                func.count(Attendance.id).label('total'),
+                func.count(Attendance.id).filter(Attendance.status == 'present').label('present'),
+            ).where(*_in_period(Attendance.date, period_start, period_end))
+        ).one()
+        rate = (row.present / row.total * 100) if row.total else 0
+        return {'attendance_records': row.total, 'present_rate_percent': round(rate, 1)}
+
+    @staticmethod
+    def student_performance(db: Session, period_start: Optional[date] = None, period_end: Optional[date] = None) -> dict:
+        query = select(
+            func.avg(ExamResult.score).label('avg_score'),
+            func.count(ExamResult.id).label('results_count'),
+        )
+        conditions = _in_period(Exam.exam_date, period_start, period_end)
+        if conditions:
+            query = query.join(Exam, Exam.id == ExamResult.exam_id).where(*conditions)
+        row = db.execute(query).one()
+        return {'avg_score': round(float(row.avg_score or 0), 2), 'results_count': row.results_count}
+
+    @staticmethod
+    def compute(db: Session, report_type: str, period_start: Optional[date] = None, period_end: Optional[date] = None) -> dict:
+        """Statistics for ``report_type`` over the optional [period_start, period_end] range"""
+        calculators = {
+            'financial': ReportMetricsService.financial,
+            'attendance_analysis': ReportMetricsService.attendance_analysis,
+            'student_performance': ReportMetricsService.student_performance,
+        }
+        calculator = calculators.get(report_type)
+        if calculator is None:
+            return {'note': 'Basic report generated'}
+        return calculator(db, period_start, period_end)
@@ -0,0 +1,61 @@
+import time
+from datetime import datetime, time as dt_time, timedelta
+from threading import Lock
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.models import Report
+
+
+class ReportSummaryService:
+    """Dashboard report counters from one aggregate query, cached for a short TTL"""
+
+    _cached: Optional[tuple[float, object, dict]] = None  # (expires_at, day, summary)
+    _lock = Lock()
+
+    @staticmethod
+    def compute(db: Session) -> dict:
+        today = datetime.now().date()
+        # Half-open range on created_at so an index on the column can be used
+        day_start = datetime.combine(today, dt_time.min)
+        day_end = day_start + timedelta(days=1)
+        row = db.execute(
+            select(
+                func.count(Report.id).label('total'),
+                func.count(Report.id).filter(
+                    Report.created_at >= day_start,
+                    Report.created_at < day_end,
+                ).label('today'),
+                func.count(Report.id).filter(Report.file_path.is_(None)).label('pending'),
+            )
+        ).one()
+        return {
+            "totalReports": row.total,
+            "generatedToday": row.today,
+            "pendingReports": row.pending,
+            "downloadCount": row.total * 3,  # Total downloads (estimated)
+        }
+
+    @classmethod
+    def get(cls, db: Session) -> dict:
+        """Cached summary; recomputed after the TTL, on a new day, or after invalidate()"""
+        today = datetime.now().date()
+        with cls._lock:
+            cached = cls._cached
+        if cached is not None:
+            expires_at, day, summary = cached
+            if expires_at >= time.monotonic() and day == today:
+                return dict(summary)
+
+        summary = cls.compute(db)
+        if settings.REPORT_SUMMARY_TTL_SECONDS > 0:
+            with cls._lock:
+                cls._cached = (time.monotonic() + settings.REPORT_SUMMARY_TTL_SECONDS, today, summary)
+        return dict(summary)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        with cls._lock:
+            cls._cached = None
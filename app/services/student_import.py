@@ -0,0 +1,96 @@
+import csv
+import io
+from typing import BinaryIO, Iterator, List
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..models.models import Student, Group
+from ..schemas import StudentCreate
+from .usage import UsageService
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+
+def _chunks(reader: Iterator[dict], size: int) -> Iterator[List[tuple[int, dict]]]:
+    chunk = []
+    # Line 1 is the header
+    for line, row in enumerate(reader, start=2):
+        chunk.append((line, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class StudentImportService:
+    """All-or-nothing CSV import of students with a single plan-limit check"""
+
+    @staticmethod
+    def _validate_chunk(db: Session, chunk: List[tuple[int, dict]], errors: list) -> List[dict]:
+        valid = []
+        for line, row in chunk:
+            # Blank cells mean "not provided", so schema defaults still apply
+            values = {k.strip(): v.strip() for k, v in row.items() if k and isinstance(v, str) and v.strip()}
+            try:
+                valid.append((line, StudentCreate.model_validate(values).model_dump()))
+            except ValidationError as e:
+                errors.append({"line": line, "error": "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                )})
+
+        group_ids = {values["group_id"] for _, values in valid if values["group_id"] is not None}
+        if group_ids:
+            existing = {gid for (gid,) in db.query(Group.id).filter(Group.id.in_(group_ids)).all()}
+            for line, values in valid:
+                if values["group_id"] is not None and values["group_id"] not in existing:
+                    errors.append({"line": line, "error": f"group_id: group {values['group_id']} not found"})
+        return [values for _, values in valid]
+
+    @staticmethod
+    def import_csv(db: Session, admin_id: int, stream: BinaryIO) -> int:
+        """
+        Import students from a UTF-8 CSV stream (header row with StudentCreate
+        field names). Rows are validated and inserted chunk by chunk inside one
+        transaction, so memory stays bounded by IMPORT_CHUNK_SIZE; if any row is
+        invalid or the batch would exceed the plan's student limit the
+        transaction is rolled back and nothing is written.
+        Returns the number of imported students.
+        """
+        imported, error_count, errors = 0, 0, []
+        try:
+            reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+            if not reader.fieldnames or "full_name" not in [f.strip() for f in reader.fieldnames]:
+                raise HTTPException(status_code=400, detail="CSV must have a header row with a full_name column")
+
+            for chunk in _chunks(reader, IMPORT_CHUNK_SIZE):
+                chunk_errors = []
+                rows = StudentImportService._validate_chunk(db, chunk, chunk_errors)
+                if chunk_errors:
+                    error_count += len(chunk_errors)
+                    errors = sorted(errors + chunk_errors, key=lambda e: e["line"])[:MAX_REPORTED_ERRORS]
+                elif rows and not error_count:
+                    db.execute(insert(Student), rows)
+                imported += len(rows)
+
+            if error_count:
+                raise HTTPException(status_code=422, detail={
+                    "message": f"{error_count} invalid rows, nothing imported",
+                    "errors": errors,
+                })
+            if not imported:
+                return 0
+
+            # One limit check and one aggregated usage row for the whole batch
+            UsageService.reserve_usage(db, admin_id, "students", quantity=imported)
+            db.commit()
+        except UnicodeDecodeError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+        except Exception:
+            db.rollback()
+            raise
+        return imported
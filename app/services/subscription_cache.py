@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+import time
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..config import settings
+from ..models.models import Subscription, SubscriptionPlan
+
+# Per-session (hence per-request) memo, stored in Session.info
+_SESSION_KEY = "active_subscriptions"
+
+
+def _columns(obj) -> dict:
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns}
+
+
+def _detached(model, values: dict):
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+class SubscriptionCache:
+    """
+    Bounded, TTL-based cache of each admin's active subscription and plan.
+
+    Like the admin cache, only column values are stored and every hit builds
+    fresh detached objects, so sessions never share ORM state.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple[float, dict, dict]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, admin_id: int) -> Optional[tuple[Subscription, SubscriptionPlan]]:
+        with self._lock:
+            entry = self._entries.get(admin_id)
+            if entry is None:
+                return None
+            expires_at, subscription, plan = entry
+            if expires_at < time.monotonic():
+                del self._entries[admin_id]
+                return None
+            self._entries.move_to_end(admin_id)
+        return _detached(Subscription, subscription), _detached(SubscriptionPlan, plan)
+
+    def put(self, admin_id: int, subscription: Subscription, plan: SubscriptionPlan) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        entry = (time.monotonic() + self.ttl_seconds, _columns(subscription), _columns(plan))
+        with self._lock:
+            self._entries[admin_id] = entry
+            self._entries.move_to_end(admin_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, admin_id: Optional[int] = None) -> None:
+        """Drop the entry for ``admin_id``, or everything when omitted."""
+        with self._lock:
+            if admin_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(admin_id, None)
+
+
+subscription_cache = SubscriptionCache(settings.SUBSCRIPTION_CACHE_TTL_SECONDS, settings.SUBSCRIPTION_CACHE_MAX_ENTRIES)
+
+
+def invalidate_subscription_cache(admin_id: Optional[int] = None) -> None:
+    subscription_cache.invalidate(admin_id)
+
+
+def get_active_subscription(db: Session, admin_id: int) -> tuple[Subscription, SubscriptionPlan]:
+    """
+    The admin's active subscription and its plan, resolved at most once per
+    session and served from the process cache within its TTL. Raises 400
+    when there is none.
+    """
+    memo = db.info.setdefault(_SESSION_KEY, {})
+    if admin_id in memo:
+        return memo[admin_id]
+
+    resolved = subscription_cache.get(admin_id)
+    if resolved is None:
+        resolved = db.query(Subscription, SubscriptionPlan).join(
+            SubscriptionPlan, SubscriptionPlan.id == Subscription.plan_id
+        ).filter(
+            Subscription.admin_id == admin_id,
+            Subscription.status == 'active'
+        ).first()
+        if resolved is None:
+            if db.query(Subscription.id).filter(
+                Subscription.admin_id == admin_id,
+                Subscription.status == 'active'
+            ).first() is None:
+                raise HTTPException(status_code=400, detail="No active subscription found")
+            raise HTTPException(status_code=400, detail="Subscription plan not found")
+        resolved = tuple(resolved)
+        subscription_cache.put(admin_id, *resolved)
+
+    memo[admin_id] = resolved
+    return resolved
@@ -1,13 +1,55 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, update, cast, Numeric
 from datetime import datetime
+from typing import Callable, Optional
 from ..models.models import Teacher, TeacherStatistics, Course, Student, Feedback
 from ..database import SessionLocal
+from ..utils.upsert import insert_ignore, upsert_returning
+
+# Feedback column -> (running sum column, running count column, {stored column: scale of the average})
+FEEDBACK_METRICS = {
+    'rating': ('rating_sum', 'total_feedback_count', {'average_rating': 1.0}),
+    'satisfaction_score': ('satisfaction_sum', 'satisfaction_count', {'satisfaction_score': 10.0}),  # 1-10 -> %
+    'teaching_quality': ('teaching_quality_sum', 'teaching_quality_count', {'teaching_quality': 1.0, 'grade_improvement': 20.0}),  # 1-5 -> %
+    'course_content': ('course_content_sum', 'course_content_count', {'course_content_rating': 1.0}),
+    'communication': ('communication_sum', 'communication_count', {'communication_rating': 1.0}),
+    'helpfulness': ('helpfulness_sum', 'helpfulness_count', {'helpfulness_rating': 1.0}),
+}
 
 
 class TeacherStatsService:
     """Service to calculate and update teacher statistics"""
     
+    @staticmethod
+    def _feedback_aggregates() -> list:
+        """SUM/COUNT of every feedback metric, labelled <metric>_sum / <metric>_count"""
+        return [
+            *[func.sum(getattr(Feedback, metric)).label(f'{metric}_sum') for metric in FEEDBACK_METRICS],
+            *[func.count(getattr(Feedback, metric)).label(f'{metric}_count') for metric in FEEDBACK_METRICS],
+        ]
+    
+    @staticmethod
+    def _build_stats(total_students: int, total_subjects: int, created_at: Optional[datetime], feedback_stats) -> dict:
+        """Statistics row values from counts and a row of ``_feedback_aggregates`` (None if no feedback)"""
+        # Calculate experience (years since joining)
+        join_date = created_at or datetime.utcnow()
+        years_experience = max(0, datetime.utcnow().year - join_date.year)
+        
+        stats = {
+            'total_students': total_students,
+            'total_subjects': total_subjects,
+            'years_experience': years_experience,
+            'attendance_rate': 85.0,  # Default - would come from attendance system
+        }
+        for metric, (sum_column, count_column, targets) in FEEDBACK_METRICS.items():
+            metric_sum = float(getattr(feedback_stats, f'{metric}_sum', None) or 0)
+            metric_count = int(getattr(feedback_stats, f'{metric}_count', None) or 0)
+            stats[sum_column] = metric_sum
+            stats[count_column] = metric_count
+            for target, scale in targets.items():
+                stats[target] = round(metric_sum / metric_count * scale, 2) if metric_count else 0.0
+        return stats
+    
     @staticmethod
     def calculate_teacher_stats(db: Session, teacher_id: int) -> dict:
         """Calculate all statistics for a teacher"""
@@ -30,78 +72,38 @@ class TeacherStatsService:
         if group_ids:
             total_students = db.query(Student).filter(Student.group_id.in_(group_ids)).count()
         
-        # Calculate experience (years since joining)
-        join_date = teacher.created_at or datetime.utcnow()
-        years_experience = max(0, datetime.utcnow().year - join_date.year)
-        
         # Get feedback statistics
         feedback_stats = db.query(
-            func.avg(Feedback.rating).label('avg_rating'),
-            func.count(Feedback.id).label('total_feedbacks'),
-            func.avg(Feedback.satisfaction_score).label('avg_satisfaction'),
-            func.avg(Feedback.teaching_quality).label('avg_teaching_quality'),
-            func.avg(Feedback.course_content).label('avg_course_content'),
-            func.avg(Feedback.communication).label('avg_communication'),
-            func.avg(Feedback.helpfulness).label('avg_helpfulness')
+            *TeacherStatsService._feedback_aggregates()
         ).filter(Feedback.teacher_id == teacher_id).first()
         
-        # Calculate satisfaction percentage (1-10 scale to 0-100%)
-        satisfaction_score = 0.0
-        if feedback_stats.avg_satisfaction:
-            satisfaction_score = (float(feedback_stats.avg_satisfaction) / 10.0) * 100
-        
-        # Calculate grade improvement from teaching quality (1-5 scale to percentage)
-        grade_improvement = 0.0
-        if feedback_stats.avg_teaching_quality:
-            grade_improvement = (float(feedback_stats.avg_teaching_quality) / 5.0) * 100
-        
-        stats = {
-            'total_students': total_students,
-            'total_subjects': total_subjects,
-            'years_experience': years_experience,
-            'satisfaction_score': round(satisfaction_score, 2),
-            'average_rating': round(float(feedback_stats.avg_rating or 0), 2),
-            'total_feedback_count': int(feedback_stats.total_feedbacks or 0),
-            'teaching_quality': round(float(feedback_stats.avg_teaching_quality or 0), 2),
-            'course_content_rating': round(float(feedback_stats.avg_course_content or 0), 2),
-            'communication_rating': round(float(feedback_stats.avg_communication or 0), 2),
-            'helpfulness_rating': round(float(feedback_stats.avg_helpfulness or 0), 2),
-            'attendance_rate': 85.0,  # Default - would come from attendance system
-            'grade_improvement': round(grade_improvement, 2)
-        }
-        
+        stats = TeacherStatsService._build_stats(total_students, total_subjects, teacher.created_at, feedback_stats)
         print(f"Calculated stats for {teacher.full_name}: {stats}")
         return stats
     
+    @staticmethod
+    def _statistics_row(db: Session, teacher_id: int) -> Optional[dict]:
+        stats = TeacherStatsService.calculate_teacher_stats(db, teacher_id)
+        if not stats:
+            return None
+        return {'teacher_id': teacher_id, **stats, 'updated_at': datetime.utcnow()}
+    
+    @staticmethod
+    def _write_teacher_statistics(db: Session, teacher_id: int) -> bool:
+        """Fully recompute and upsert the statistics row of a teacher (no commit)"""
+        row = TeacherStatsService._statistics_row(db, teacher_id)
+        if not row:
+            return False
+        # ON CONFLICT so concurrent recomputes never fail on uq_teacher_statistics_teacher
+        upsert_returning(db, TeacherStatistics, [row], ['teacher_id'], [key for key in row if key != 'teacher_id'])
+        return True
+    
     @staticmethod
     def update_teacher_statistics(db: Session, teacher_id: int):
-        """Update or create teacher statistics in database"""
+        """Fully recompute teacher statistics; used by reconciliation and manual refreshes"""
         try:
-            # Calculate new stats
-            stats = TeacherStatsService.calculate_teacher_stats(db, teacher_id)
-            if not stats:
+            if not TeacherStatsService._write_teacher_statistics(db, teacher_id):
                 return False
-            
-            # Get or create teacher statistics record
-            teacher_stats = db.query(TeacherStatistics).filter(
-                TeacherStatistics.teacher_id == teacher_id
-            ).first()
-            
-            if teacher_stats:
-                # Update existing record
-                for key, value in stats.items():
-                    setattr(teacher_stats, key, value)
-                teacher_stats.updated_at = datetime.utcnow()
-                print(f"Updated existing stats for teacher {teacher_id}")
-            else:
-                # Create new record
-                teacher_stats = TeacherStatistics(
-                    teacher_id=teacher_id,
-                    **stats
-                )
-                db.add(teacher_stats)
-                print(f"Created new stats record for teacher {teacher_id}")
-            
             db.commit()
             return True
             
@@ -111,8 +113,73 @@ class TeacherStatsService:
             return False
     
     @staticmethod
-    def update_all_teacher_statistics(db: Session = None):
-        """Update statistics for all teachers"""
+    def feedback_metrics(feedback: Optional[Feedback]) -> Optional[dict]:
+        """Snapshot of the feedback values that feed teacher statistics"""
+        if feedback is None:
+            return None
+        return {metric: getattr(feedback, metric) for metric in FEEDBACK_METRICS}
+    
+    @staticmethod
+    def apply_feedback_delta(db: Session, teacher_id: Optional[int], old: Optional[dict], new: Optional[dict]):
+        """
+        Fold one feedback insert/update/delete into the teacher's running sums
+        with a single UPDATE; ``old``/``new`` come from ``feedback_metrics``
+        (None for an insert/delete). Falls back to a full recompute when the
+        statistics row is missing or predates the running sums. Does not commit;
+        the feedback write must already be flushed.
+        """
+        if teacher_id is None:
+            return
+        
+        values = {'updated_at': datetime.utcnow()}
+        for metric, (sum_column, count_column, targets) in FEEDBACK_METRICS.items():
+            old_value = (old or {}).get(metric)
+            new_value = (new or {}).get(metric)
+            sum_delta = (new_value or 0) - (old_value or 0)
+            count_delta = (new_value is not None) - (old_value is not None)
+            
+            new_sum = getattr(TeacherStatistics, sum_column) + sum_delta
+            new_count = func.coalesce(getattr(TeacherStatistics, count_column), 0) + count_delta
+            values[sum_column] = new_sum
+            values[count_column] = new_count
+            for target, scale in targets.items():
+                # SET expressions see the pre-update row, so averages use the new sum/count expressions
+                average = func.coalesce(new_sum / func.nullif(new_count, 0), 0) * scale
+                values[target] = func.round(cast(average, Numeric), 2)
+        
+        delta = (
+            update(TeacherStatistics)
+            .where(
+                TeacherStatistics.teacher_id == teacher_id,
+                TeacherStatistics.rating_sum.isnot(None),
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(delta).rowcount:
+            return
+        
+        # No usable row yet: seed one from a full recompute, which already counts this feedback.
+        # If a concurrent request created the row first, keep it and fold this delta into it.
+        row = TeacherStatsService._statistics_row(db, teacher_id)
+        if row is None or insert_ignore(db, TeacherStatistics, [row], ['teacher_id']):
+            return
+        if db.execute(delta).rowcount == 0:
+            # The row predates the running sums
+            TeacherStatsService._write_teacher_statistics(db, teacher_id)
+    
+    @staticmethod
+    def update_all_teacher_statistics(
+        db: Session = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        batch_size: int = 500,
+    ):
+        """
+        Recompute statistics for all teachers with set-based queries: feedback
+        aggregates and subject/student counts GROUP BY teacher, then one bulk
+        upsert per ``batch_size`` rows, all in a single transaction.
+        ``progress(done, total)`` is called after each batch.
+        """
         if db is None:
             db = SessionLocal()
             should_close = True
@@ -120,18 +187,58 @@ class TeacherStatsService:
             should_close = False
         
         try:
-            teachers = db.query(Teacher).all()
-            updated_count = 0
+            teachers = db.query(Teacher.id, Teacher.created_at).order_by(Teacher.id).all()
+            
+            subject_counts = dict(
+                db.query(Course.teacher_id, func.count(Course.id))
+                .filter(Course.teacher_id.isnot(None))
+                .group_by(Course.teacher_id)
+                .all()
+            )
+            student_counts = dict(
+                db.query(Course.teacher_id, func.count(func.distinct(Student.id)))
+                .join(Student, Student.group_id == Course.group_id)
+                .filter(Course.teacher_id.isnot(None))
+                .group_by(Course.teacher_id)
+                .all()
+            )
+            feedback_stats = {
+                row.teacher_id: row
+                for row in db.query(Feedback.teacher_id, *TeacherStatsService._feedback_aggregates())
+                .filter(Feedback.teacher_id.isnot(None))
+                .group_by(Feedback.teacher_id)
+                .all()
+            }
             
-            for teacher in teachers:
-                if TeacherStatsService.update_teacher_statistics(db, teacher.id):
-                    updated_count += 1
+            now = datetime.utcnow()
+            rows = [
+                {
+                    'teacher_id': teacher.id,
+                    **TeacherStatsService._build_stats(
+                        student_counts.get(teacher.id, 0),
+                        subject_counts.get(teacher.id, 0),
+                        teacher.created_at,
+                        feedback_stats.get(teacher.id),
+                    ),
+                    'updated_at': now,
+                }
+                for teacher in teachers
+            ]
             
-            print(f"Updated statistics for {updated_count}/{len(teachers)} teachers")
-            return updated_count
+            total = len(rows)
+            update_columns = [key for key in rows[0] if key != 'teacher_id'] if rows else []
+            for start in range(0, total, batch_size):
+                upsert_returning(db, TeacherStatistics, rows[start:start + batch_size], ['teacher_id'], update_columns)
+                if progress:
+                    progress(min(start + batch_size, total), total)
+            db.commit()
+            
+            print(f"Updated statistics for {total}/{len(teachers)} teachers")
+            return total
             
         except Exception as e:
             print(f"Error updating all teacher statistics: {e}")
+            db.rollback()
             return 0
         finally:
             if should_close:
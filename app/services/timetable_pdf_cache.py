@@ -0,0 +1,60 @@
+import glob
+import hashlib
+import json
+import os
+import uuid
+
+from ..config import settings
+
+# Bump when the timetable PDF layout changes so cached files are regenerated
+TIMETABLE_LAYOUT_VERSION = "2"
+
+
+class TimetablePdfCache:
+    """Content-addressed cache of generated group timetable PDFs"""
+
+    @staticmethod
+    def key(group_name: str, rows: list[dict]) -> str:
+        """Hash of everything that ends up in the PDF"""
+        payload = json.dumps([TIMETABLE_LAYOUT_VERSION, group_name, rows], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _path(group_id: int, key: str) -> str:
+        return os.path.join(settings.TIMETABLE_CACHE_DIR, f"timetable_g{group_id}_{key}.pdf")
+
+    @staticmethod
+    def _group_files(group_id: int) -> list[str]:
+        return glob.glob(os.path.join(settings.TIMETABLE_CACHE_DIR, f"timetable_g{group_id}_*.pdf"))
+
+    @staticmethod
+    def get_or_create(group_id: int, group_name: str, rows: list[dict], key: str) -> str:
+        """Return the cached PDF for ``key``, generating it (and dropping stale ones) on a miss"""
+        path = TimetablePdfCache._path(group_id, key)
+        if os.path.exists(path):
+            return path
+
+        from ..utils.pdf_generator import generate_group_timetable_pdf  # heavy; only on a cache miss
+
+        # Render to a private temp file, then publish atomically
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        generate_group_timetable_pdf(group_name, rows, filepath=tmp_path)
+        os.replace(tmp_path, path)
+
+        for stale in TimetablePdfCache._group_files(group_id):
+            if stale != path:
+                TimetablePdfCache._remove(stale)
+        return path
+
+    @staticmethod
+    def invalidate(group_id: int) -> None:
+        """Drop every cached timetable PDF of a group"""
+        for path in TimetablePdfCache._group_files(group_id):
+            TimetablePdfCache._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
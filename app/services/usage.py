@@ -1,13 +1,129 @@
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, update
 from fastapi import HTTPException
 
-from ..models.models import UsageMetrics, Subscription, SubscriptionPlan
+from ..models.models import UsageMetrics, UsageCounter, Subscription, SubscriptionPlan
+from ..utils.upsert import insert_ignore
+from .subscription_cache import get_active_subscription
 from ..schemas.subscription import UsageMetricsCreate
 
 class UsageService:
+    @staticmethod
+    def _period_start(subscription: Subscription) -> Optional[datetime]:
+        if subscription.current_period_start is not None and subscription.current_period_end is not None:
+            return subscription.current_period_start
+        return None
+
+    @staticmethod
+    def _increment_counter(
+        db: Session,
+        subscription: Subscription,
+        metric_type: str,
+        quantity: int,
+        limit: Optional[int]
+    ) -> Optional[int]:
+        """
+        ``UPDATE ... SET value = value + quantity ... RETURNING value`` on the
+        counter of the current period, guarded by the limit in the same
+        statement. Returns None if no row matched (missing or stale counter,
+        or the limit would be exceeded).
+        """
+        stmt = update(UsageCounter).where(
+            UsageCounter.subscription_id == subscription.id,
+            UsageCounter.metric_type == metric_type,
+            UsageCounter.period_start.is_not_distinct_from(UsageService._period_start(subscription)),
+        )
+        if limit:
+            stmt = stmt.where(UsageCounter.value + quantity <= limit)
+        stmt = stmt.values(
+            value=UsageCounter.value + quantity,
+            updated_at=datetime.utcnow(),
+        ).returning(UsageCounter.value).execution_options(synchronize_session=False)
+        return db.execute(stmt).scalar_one_or_none()
+
+    @staticmethod
+    def _ensure_counter(db: Session, subscription: Subscription, metric_type: str) -> bool:
+        """Create the counter, or restart it for a new billing period; False if it was already current"""
+        period_start = UsageService._period_start(subscription)
+        counter = db.query(UsageCounter.period_start).filter(
+            UsageCounter.subscription_id == subscription.id,
+            UsageCounter.metric_type == metric_type
+        ).first()
+
+        if counter is None:
+            # Seed from the usage history recorded before counters existed
+            seed = db.query(func.sum(UsageMetrics.quantity)).filter(
+                UsageMetrics.subscription_id == subscription.id,
+                UsageMetrics.metric_type == metric_type
+            )
+            if period_start is not None:
+                seed = seed.filter(
+                    UsageMetrics.timestamp >= subscription.current_period_start,
+                    UsageMetrics.timestamp <= subscription.current_period_end
+                )
+            insert_ignore(db, UsageCounter, [{
+                "subscription_id": subscription.id,
+                "metric_type": metric_type,
+                "value": seed.scalar() or 0,
+                "period_start": period_start,
+                "updated_at": datetime.utcnow(),
+            }], ["subscription_id", "metric_type"])
+            return True
+
+        if counter.period_start != period_start:
+            db.execute(
+                update(UsageCounter).where(
+                    UsageCounter.subscription_id == subscription.id,
+                    UsageCounter.metric_type == metric_type,
+                    UsageCounter.period_start.is_distinct_from(period_start),
+                ).values(value=0, period_start=period_start, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            return True
+
+        return False
+
+    @staticmethod
+    def reserve_usage(
+        db: Session,
+        admin_id: int,
+        metric_type: str,
+        quantity: int = 1
+    ) -> UsageMetrics:
+        """
+        Check ``quantity`` more units of ``metric_type`` against the plan limit
+        and stage a single UsageMetrics row for them, without committing.
+
+        Raises HTTPException(400) when there is no active subscription or the
+        limit would be exceeded, so callers can make it part of their own
+        transaction (e.g. a bulk import).
+        """
+        # Active subscription and plan limits (cached per request and per process)
+        subscription, plan = get_active_subscription(db, admin_id)
+
+        # Atomically add to the running counter, only if the limit still allows it
+        limit = getattr(plan, f"max_{metric_type}", None)
+        value = UsageService._increment_counter(db, subscription, metric_type, quantity, limit)
+        if value is None and UsageService._ensure_counter(db, subscription, metric_type):
+            # First use of this counter or a new billing period: retry on the fresh counter
+            value = UsageService._increment_counter(db, subscription, metric_type, quantity, limit)
+        if value is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"This operation would exceed your {metric_type} limit of {limit}"
+            )
+
+        usage = UsageMetrics(
+            subscription_id=subscription.id,
+            metric_type=metric_type,
+            quantity=quantity,
+            timestamp=datetime.utcnow()
+        )
+        db.add(usage)
+        return usage
+
     @staticmethod
     async def track_usage(
         db: Session,
@@ -25,54 +141,7 @@ class UsageService:
             quantity: Amount to increment the usage by
         """
         try:
-            # Get active subscription for admin
-            subscription = db.query(Subscription).filter(
-                Subscription.admin_id == admin_id,
-                Subscription.status == 'active'
-            ).first()
-            
-            if not subscription:
-                raise HTTPException(status_code=400, detail="No active subscription found")
-
-            # Get subscription plan limits
-            plan = db.query(SubscriptionPlan).filter(
-                SubscriptionPlan.id == subscription.plan_id
-            ).first()
-
-            if not plan:
-                raise HTTPException(status_code=400, detail="Subscription plan not found")
-
-            # Get current usage for this metric type
-            current_usage = db.query(func.sum(UsageMetrics.quantity)).filter(
-                UsageMetrics.subscription_id == subscription.id,
-                UsageMetrics.metric_type == metric_type
-            ).scalar() or 0
-
-            # If subscription has period dates, filter by them
-            if subscription.current_period_start is not None and subscription.current_period_end is not None:
-                current_usage = db.query(func.sum(UsageMetrics.quantity)).filter(
-                    UsageMetrics.subscription_id == subscription.id,
-                    UsageMetrics.metric_type == metric_type,
-                    UsageMetrics.timestamp >= subscription.current_period_start,
-                    UsageMetrics.timestamp <= subscription.current_period_end
-                ).scalar() or 0
-
-            # Check if this would exceed plan limits
-            limit = getattr(plan, f"max_{metric_type}", None)
-            if limit and (current_usage + quantity) > limit:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"This operation would exceed your {metric_type} limit of {limit}"
-                )
-
-            # Create new usage metric
-            usage = UsageMetrics(
-                subscription_id=subscription.id,
-                metric_type=metric_type,
-                quantity=quantity,
-                timestamp=datetime.utcnow()
-            )
-            db.add(usage)
+            usage = UsageService.reserve_usage(db, admin_id, metric_type, quantity)
             db.commit()
             db.refresh(usage)
 
@@ -97,48 +166,22 @@ class UsageService:
             metric_type: Optional specific metric type to query
         """
         try:
-            # Get active subscription
-            subscription = db.query(Subscription).filter(
-                Subscription.admin_id == admin_id,
-                Subscription.status == 'active'
-            ).first()
-
-            if not subscription:
-                raise HTTPException(status_code=400, detail="No active subscription found")
-
-            # Base query for usage metrics
-            query = db.query(
-                UsageMetrics.metric_type,
-                func.sum(UsageMetrics.quantity).label('total')
-            ).filter(
-                UsageMetrics.subscription_id == subscription.id
-            )
-
-            # If subscription has period dates, filter by them
-            if subscription.current_period_start is not None and subscription.current_period_end is not None:
-                query = query.filter(
-                    UsageMetrics.timestamp >= subscription.current_period_start,
-                    UsageMetrics.timestamp <= subscription.current_period_end
-                )
+            # Get active subscription and plan limits
+            subscription, plan = get_active_subscription(db, admin_id)
 
-            # Add metric type filter if specified
+            # Running counters; a counter from an earlier billing period means no usage yet
+            query = db.query(UsageCounter).filter(
+                UsageCounter.subscription_id == subscription.id
+            )
             if metric_type:
-                query = query.filter(UsageMetrics.metric_type == metric_type)
-
-            # Group by metric type
-            query = query.group_by(UsageMetrics.metric_type)
+                query = query.filter(UsageCounter.metric_type == metric_type)
 
-            # Execute query and format results
+            period_start = UsageService._period_start(subscription)
             usage_stats = {
-                row.metric_type: row.total
-                for row in query.all()
+                counter.metric_type: counter.value if counter.period_start == period_start else 0
+                for counter in query.all()
             }
 
-            # Get plan limits
-            plan = db.query(SubscriptionPlan).filter(
-                SubscriptionPlan.id == subscription.plan_id
-            ).first()
-
             # Add limits to response
             response = {
                 metric: {
@@ -1,19 +1,30 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Optional
+import time
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from ..config import settings
-from ..database import get_db
+from ..database import get_async_db
 from ..models.models import Admin
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# bcrypt releases the GIL, so a small pool runs hashes in parallel without touching the event loop
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -23,6 +34,91 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _verify_and_rehash(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    # Hashes made with an older cost factor are replaced while the plain password is at hand
+    return True, pwd_context.hash(plain_password) if pwd_context.needs_update(hashed_password) else None
+
+
+def submit_password_task(fn: Callable, *args) -> Future:
+    """Queue ``fn`` on the bcrypt pool, shedding load with a 503 once too many are pending."""
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """(valid, new_hash): new_hash is set when the stored hash should be upgraded."""
+    return await asyncio.wrap_future(submit_password_task(_verify_and_rehash, plain_password, hashed_password))
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(submit_password_task(pwd_context.hash, password))
+
+
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    """verify_password for sync handlers, bounded by the same pool and limit."""
+    return submit_password_task(verify_password, plain_password, hashed_password).result()
+
+
+def hash_password_pooled(password: str) -> str:
+    return submit_password_task(pwd_context.hash, password).result()
+
+
+class RateLimiter:
+    """
+    Token bucket per key: ``rate`` attempts per second, bursting up to ``rate``.
+
+    Buckets are kept in a bounded LRU; an evicted key simply starts full again.
+    """
+
+    def __init__(self, rate: int, max_keys: int = 10000):
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def allow(self, key: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(self.rate), now))
+            tokens = min(float(self.rate), tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+login_rate_limiter = RateLimiter(settings.RATE_LIMIT_PER_SECOND)
+
+
+def check_login_rate(username: str, client_ip: Optional[str]) -> None:
+    """Raise 429 when the username or the client address exceeds RATE_LIMIT_PER_SECOND."""
+    keys = [f"user:{username.lower()}"] + ([f"ip:{client_ip}"] if client_ip else [])
+    # Evaluate every key so each bucket is charged for the attempt
+    if not all([login_rate_limiter.allow(key) for key in keys]):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, slow down",
+            headers={"Retry-After": "1"},
+        )
+
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode = {"sub": subject, "exp": expire}
@@ -38,14 +134,73 @@ def decode_token(token: str) -> Optional[str]:
         return None
 
 
+class AdminCache:
+    """
+    Bounded, TTL-based cache of admin rows keyed by bearer token.
+
+    Only plain column values are stored; every hit builds a fresh detached
+    Admin so request handlers never share ORM state across sessions.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> Optional[Admin]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+        admin = Admin(**values)
+        make_transient_to_detached(admin)
+        return admin
+
+    def put(self, token: str, admin: Admin) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        values = {c.key: getattr(admin, c.key) for c in Admin.__table__.columns}
+        with self._lock:
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        """Drop cached entries for ``username``, or everything when omitted."""
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+                return
+            for token in [t for t, (_, v) in self._entries.items() if v["username"] == username]:
+                del self._entries[token]
+
+
+admin_cache = AdminCache(settings.ADMIN_CACHE_TTL_SECONDS, settings.ADMIN_CACHE_MAX_ENTRIES)
+
+
+def invalidate_admin_cache(username: Optional[str] = None) -> None:
+    admin_cache.invalidate(username)
+
+
 async def get_current_admin(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Admin:
     username = decode_token(token)
     if username is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    admin = db.query(Admin).filter(Admin.username == username).first()
+    admin = admin_cache.get(token)
+    if admin is not None and admin.username == username:
+        return admin
+    admin = (await db.scalars(select(Admin).where(Admin.username == username).limit(1))).first()
     if not admin:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    admin_cache.put(token, admin)
     return admin
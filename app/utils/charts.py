@@ -0,0 +1,53 @@
+import hashlib
+import io
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from ..config import settings
+
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def _chart_key(kind: str, title: str, values: list, labels: Optional[list]) -> str:
+    payload = json.dumps([kind, title, values, labels], default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _render_line_chart(title: str, values: list, labels: Optional[list]) -> bytes:
+    # matplotlib is slow and memory-hungry to import; pay that only when a chart is drawn
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 3))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(values, marker='o')
+    if labels:
+        ax.set_xticks(range(len(values)))
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+    ax.set_title(title)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
+
+
+def render_line_chart(title: str, values: list, labels: Optional[list] = None) -> bytes:
+    """Return a PNG line chart, cached by its data."""
+    key = _chart_key("line", title, values, labels)
+    with _cache_lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+            return png
+
+    png = _render_line_chart(title, values, labels)
+
+    with _cache_lock:
+        _cache[key] = png
+        while len(_cache) > settings.CHART_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return png
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_export(db: Session, model, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Yield ``model``'s rows as CSV or NDJSON, one encoded chunk per batch.
+
+    Rows are read through ``yield_per`` (a server-side cursor on PostgreSQL)
+    as plain column tuples, so memory stays bounded by ``batch_size``
+    whatever the table size.
+    """
+    columns = list(model.__table__.columns)
+    names = [c.key for c in columns]
+    result = db.execute(
+        select(*columns).order_by(model.id).execution_options(yield_per=batch_size)
+    )
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield buffer.getvalue().encode()
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+    elif fmt == "ndjson":
+        for rows in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(names, row)), default=str, ensure_ascii=False) + "\n"
+                for row in rows
+            ).encode()
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
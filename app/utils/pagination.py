@@ -0,0 +1,69 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as SAQuery
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last row of a page into an opaque cursor."""
+    raw = json.dumps({"id": int(last_id)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor, raising 400 on garbage."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded.encode()))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+class PageParams:
+    """Query parameters shared by keyset-paginated list endpoints."""
+
+    def __init__(
+        self,
+        after: Optional[str] = Query(None, description="Opaque cursor returned in the X-Next-Cursor header"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.after = after
+        self.limit = limit
+
+
+def _page_query(query, id_column, page: PageParams):
+    # Works on both Query and Select, which share filter/order_by/limit
+    if page.after:
+        query = query.filter(id_column < decode_cursor(page.after))
+    return query.order_by(id_column.desc()).limit(page.limit + 1)
+
+
+def _page_rows(rows: list, page: PageParams, response: Response) -> list:
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return rows
+
+
+def paginate(query: SAQuery, id_column, page: PageParams, response: Response) -> list:
+    """
+    Apply keyset pagination (newest first) on ``id_column`` to ``query``.
+
+    Fetches one extra row to know whether another page exists; when it does,
+    the cursor for it is exposed through the X-Next-Cursor response header.
+    """
+    return _page_rows(_page_query(query, id_column, page).all(), page, response)
+
+
+async def paginate_async(db: AsyncSession, stmt: Select, id_column, page: PageParams, response: Response) -> list:
+    """paginate() for a ``select()`` of one entity on an AsyncSession."""
+    rows = (await db.scalars(_page_query(stmt, id_column, page))).all()
+    return _page_rows(list(rows), page, response)
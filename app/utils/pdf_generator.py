@@ -1,4 +1,5 @@
 from datetime import datetime
+import io
 import os
 from typing import Optional, Tuple
 
@@ -7,10 +8,10 @@ from reportlab.lib import colors
 from reportlab.pdfgen.canvas import Canvas
 from reportlab.lib.units import mm
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-import matplotlib.pyplot as plt
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
 
 from ..config import settings
+from .charts import render_line_chart
 
 
 def _header_footer(canvas: Canvas, doc, title: str):
@@ -80,22 +81,6 @@ def generate_receipt_pdf(student_name: str, payment: dict) -> str:
     return filepath
 
 
-def _save_matplotlib_chart(title: str, values: list, labels: Optional[list] = None) -> str:
-    plt.figure(figsize=(6, 3))
-    if labels:
-        plt.plot(values, marker='o')
-        plt.xticks(range(len(values)), labels, rotation=45, ha='right')
-    else:
-        plt.plot(values, marker='o')
-    plt.title(title)
-    plt.tight_layout()
-    img_path = os.path.join(settings.REPORTS_DIR, f"chart_{int(datetime.utcnow().timestamp())}.png")
-    _ensure_dir(img_path)
-    plt.savefig(img_path)
-    plt.close()
-    return img_path
-
-
 def generate_report_pdf(report_type: str, period: Tuple[Optional[str], Optional[str]], options: dict, stats: dict) -> str:
     """
     report_type: student_performance | teacher_performance | course_analytics | attendance_analysis | enrollment | financial
@@ -147,8 +132,8 @@ def generate_report_pdf(report_type: str, period: Tuple[Optional[str], Optional[
 
     if options.get('include_graphs'):
         # Example chart
-        chart_path = _save_matplotlib_chart("Monthly Trend", [10, 14, 12, 20, 18, 22], labels=["Jan","Feb","Mar","Apr","May","Jun"])
-        story.append(Image(chart_path, width=170*mm, height=70*mm))
+        chart_png = render_line_chart("Monthly Trend", [10, 14, 12, 20, 18, 22], labels=["Jan","Feb","Mar","Apr","May","Jun"])
+        story.append(Image(io.BytesIO(chart_png), width=170*mm, height=70*mm))
         story.append(Spacer(1, 8))
 
     def on_page(canvas, doc):
@@ -157,82 +142,105 @@ def generate_report_pdf(report_type: str, period: Tuple[Optional[str], Optional[
     doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
     return filepath
 
-def generate_group_timetable_pdf(group_name: str, rows: list[dict]) -> str:
+TIMETABLE_DAYS = [(1, 'Lundi'), (2, 'Mardi'), (3, 'Mercredi'), (4, 'Jeudi'), (5, 'Vendredi'), (6, 'Samedi'), (0, 'Dimanche')]
+TIMETABLE_HOURS = list(range(8, 22))
+
+_TIMETABLE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('GRID', (0,0), (-1,-1), 1, colors.red), # Red grid
+    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ('FONTSIZE', (0,0), (-1,-1), 7),
+])
+
+
+def _timetable_grid(rows: list[dict]) -> list[list[str]]:
+    """Build the day x hour grid; sessions are indexed by (day, start hour) instead of scanned per slot."""
+    sessions = {}
+    for r in sorted(rows, key=lambda x: x.get('start', '')):
+        start_hour = int(r.get('start', '00:00').split(':')[0])
+        # First session starting in an hour keeps the slot, as before
+        sessions.setdefault((int(r.get('day', 0)), start_hour), r)
+
+    data = [['Jour'] + [f"{hour:02d}h" for hour in TIMETABLE_HOURS]]
+    for day_index, day_name in TIMETABLE_DAYS:
+        row = [day_name]
+        i = 0
+        while i < len(TIMETABLE_HOURS):
+            session = sessions.get((day_index, TIMETABLE_HOURS[i]))
+            if session is None:
+                row.append("")
+                i += 1
+                continue
+            start_hour = int(session.get('start', '00:00').split(':')[0])
+            end_hour = int(session.get('end', '00:00').split(':')[0])
+            # Sessions shorter than an hour still take their slot; never run past the last column
+            duration = min(max(end_hour - start_hour, 1), len(TIMETABLE_HOURS) - i)
+            row.append(session.get('course', ''))
+            row.extend([""] * (duration - 1))
+            i += duration
+        data.append(row)
+    return data
+
+
+def _timetable_story(group_name: str, rows: list[dict], styles, width: float) -> list:
+    col_widths = [20*mm] + [(width - 20*mm) / len(TIMETABLE_HOURS)] * len(TIMETABLE_HOURS)
+    t = Table(_timetable_grid(rows), colWidths=col_widths)
+    t.setStyle(_TIMETABLE_TABLE_STYLE)
+    return [
+        Paragraph(f"Emploi du temps - {group_name}", styles['Title']),
+        Spacer(1, 5),
+        t,
+        Spacer(1, 10),
+    ]
+
+
+def _timetable_doc(filepath: str) -> SimpleDocTemplate:
+    return SimpleDocTemplate(filepath, pagesize=landscape(A4), leftMargin=5*mm, rightMargin=5*mm, topMargin=15*mm, bottomMargin=10*mm)
+
+
+def generate_group_timetable_pdf(group_name: str, rows: list[dict], filepath: Optional[str] = None) -> str:
     """Generate a timetable PDF for a single group and return absolute file path.
     rows: list of { 'day': int, 'start': 'HH:MM', 'end': 'HH:MM', 'course': str }
+    filepath: where to write the PDF (defaults to a timestamped file in REPORTS_DIR)
     """
-    filename = f"timetable_{int(datetime.utcnow().timestamp())}.pdf"
-    filepath = os.path.join(settings.REPORTS_DIR, filename)
+    if filepath is None:
+        filename = f"timetable_{int(datetime.utcnow().timestamp())}.pdf"
+        filepath = os.path.join(settings.REPORTS_DIR, filename)
     _ensure_dir(filepath)
 
-    doc = SimpleDocTemplate(filepath, pagesize=landscape(A4), leftMargin=5*mm, rightMargin=5*mm, topMargin=15*mm, bottomMargin=10*mm)
-    styles = getSampleStyleSheet()
-    story = []
-
-    story.append(Paragraph(f"Emploi du temps - {group_name}", styles['Title']))
-    story.append(Spacer(1, 5))
-
-    day_map = {1: 'Lundi', 2: 'Mardi', 3: 'Mercredi', 4: 'Jeudi', 5: 'Vendredi', 6: 'Samedi', 0: 'Dimanche'}
-    day_order = [1, 2, 3, 4, 5, 6, 0]
-
-    time_slots = []
-    for hour in range(8, 22):
-        time_slots.append(f"{hour:02d}:00")
+    doc = _timetable_doc(filepath)
+    story = _timetable_story(group_name, rows, getSampleStyleSheet(), doc.width)
 
-    data = [['Jour'] + [f"{t.split(':')[0]}h" for t in time_slots]]
+    def on_page(canvas, doc):
+        _header_footer(canvas, doc, title=f"Emploi du Temps - {group_name}")
 
-    sessions_by_day = {day: [] for day in day_order}
-    for r in rows:
-        sessions_by_day[int(r.get('day', 0))].append(r)
+    doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    return filepath
 
-    for day_index in day_order:
-        day_name = day_map[day_index]
-        row = [day_name]
-        
-        day_sessions = sorted(sessions_by_day.get(day_index, []), key=lambda x: x.get('start', ''))
-        
-        i = 0
-        while i < len(time_slots):
-            slot_start = time_slots[i]
-            session_found = None
-            for s in day_sessions:
-                if s.get('start') == slot_start:
-                    session_found = s
-                    break
-            
-            if session_found:
-                start_time = session_found.get('start', '00:00')
-                end_time = session_found.get('end', '00:00')
-                start_hour = int(start_time.split(':')[0])
-                end_hour = int(end_time.split(':')[0])
-                duration = end_hour - start_hour
-                
-                row.append(session_found.get('course', ''))
-                if duration > 1:
-                    for _ in range(duration - 1):
-                        row.append("")
-                i += duration
-            else:
-                row.append("")
-                i += 1
-        data.append(row)
 
-    col_widths = [20*mm] + [(doc.width - 20*mm) / len(time_slots)] * len(time_slots)
+def generate_all_timetables_pdf(groups: list[dict], filepath: Optional[str] = None) -> str:
+    """Generate one PDF holding every group's timetable, one group per page.
+    groups: list of { 'group_name': str, 'rows': [...] } with rows as in generate_group_timetable_pdf
+    """
+    if filepath is None:
+        filename = f"timetables_all_{int(datetime.utcnow().timestamp())}.pdf"
+        filepath = os.path.join(settings.REPORTS_DIR, filename)
+    _ensure_dir(filepath)
 
-    t = Table(data, colWidths=col_widths)
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('GRID', (0,0), (-1,-1), 1, colors.red), # Red grid
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('FONTSIZE', (0,0), (-1,-1), 7),
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 10))
+    doc = _timetable_doc(filepath)
+    styles = getSampleStyleSheet()
+    story = []
+    for index, group in enumerate(groups):
+        if index:
+            story.append(PageBreak())
+        story.extend(_timetable_story(group['group_name'], group['rows'], styles, doc.width))
+    if not story:
+        story.append(Paragraph("Aucun emploi du temps", styles['Normal']))
 
     def on_page(canvas, doc):
-        _header_footer(canvas, doc, title=f"Emploi du Temps - {group_name}")
+        _header_footer(canvas, doc, title="Emplois du Temps")
 
     doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
     return filepath
@@ -272,4 +280,15 @@ def generate_document_pdf(doc_type: str, student_name: Optional[str], meta: Opti
         _header_footer(canvas, doc, title="Official Document / وثيقة")
 
     doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
-    return filepath
\ No newline at end of file
+    return filepath
+
+def render_pdf(kind: str, params: dict) -> str:
+    """Entry point for PDF job workers: run the generator for ``kind`` and return the file path."""
+    renderers = {
+        'receipt': generate_receipt_pdf,
+        'report': generate_report_pdf,
+        'timetable': generate_group_timetable_pdf,
+        'timetables': generate_all_timetables_pdf,
+        'document': generate_document_pdf,
+    }
+    return renderers[kind](**params)
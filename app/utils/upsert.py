@@ -0,0 +1,47 @@
+from typing import List, Sequence
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+
+
+def upsert_returning(
+    db: Session,
+    model,
+    rows: List[dict],
+    index_elements: Sequence[str],
+    update_columns: Sequence[str],
+) -> list:
+    """
+    Insert ``rows`` with a single ``INSERT ... ON CONFLICT (index_elements)
+    DO UPDATE ... RETURNING`` statement and return the resulting ORM objects.
+
+    The conflict target must be backed by a unique index. PostgreSQL is the
+    production backend; SQLite (3.35+) is supported so tests run in memory.
+    Callers must de-duplicate ``rows`` on the conflict key beforehand.
+    """
+    if not rows:
+        return []
+
+    stmt = _dialect_insert(db)(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={column: stmt.excluded[column] for column in update_columns},
+    ).returning(model)
+    return list(db.scalars(stmt, execution_options={"populate_existing": True}))
+
+
+def insert_ignore(db: Session, model, rows: List[dict], index_elements: Sequence[str]) -> int:
+    """``INSERT ... ON CONFLICT (index_elements) DO NOTHING`` for ``rows``; returns the number inserted."""
+    if not rows:
+        return 0
+    stmt = _dialect_insert(db)(model).values(rows)
+    return db.execute(stmt.on_conflict_do_nothing(index_elements=list(index_elements))).rowcount
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Apply pending schema migrations (app/migrations.py) to DATABASE_URL.
+Run once per deploy, before starting the app workers; safe to re-run.
+
+    python migrate.py            # apply everything pending
+    python migrate.py --status   # show the current and latest versions
+    python migrate.py --to 3     # stop after version 3
+"""
+
+import argparse
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from app.database import engine
+from app.migrations import LATEST_VERSION, MIGRATIONS, current_version, run_migrations
+
+def migrate(target=None, status_only=False):
+    try:
+        with engine.connect() as conn:
+            version = current_version(conn)
+        print(f"📋 Schema version {version}, latest {LATEST_VERSION}")
+        if status_only:
+            for migration in MIGRATIONS:
+                mark = "✓" if migration.version <= version else " "
+                print(f"   [{mark}] {migration.version}: {migration.description}")
+            return True
+
+        applied = run_migrations(
+            engine, target, progress=lambda m: print(f"   ✓ {m.version}: {m.description}")
+        )
+        print(f"✅ Applied {len(applied)} migration(s)" if applied else "✅ Schema is up to date")
+        return True
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply EduManage schema migrations")
+    parser.add_argument("--status", action="store_true", help="show versions without migrating")
+    parser.add_argument("--to", type=int, default=None, help="highest version to apply")
+    args = parser.parse_args()
+    sys.exit(0 if migrate(args.to, args.status) else 1)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rebuild the materialized subject_grade_summaries table from student_grades.
+Run once before setting GRADE_SUMMARY_ENABLED=true.
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from app.database import SessionLocal
+from app.services.grade_average_service import GradeAverageService
+
+def rebuild_grade_summaries():
+    db = SessionLocal()
+    try:
+        print("🔧 Rebuilding subject_grade_summaries...")
+        GradeAverageService.rebuild_summaries(db)
+        print("✅ Grade summaries rebuilt")
+        return True
+    except Exception as e:
+        print(f"❌ Error rebuilding grade summaries: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if rebuild_grade_summaries() else 1)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Reconcile teacher_statistics with a full recompute from feedback, courses and students.
+Feedback submissions only apply deltas; schedule this (e.g. nightly cron) to correct
+drift and refresh student/subject counts and experience.
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '.'))
+
+from app.database import SessionLocal
+from app.services.teacher_stats_service import TeacherStatsService
+
+def reconcile_teacher_statistics():
+    db = SessionLocal()
+    try:
+        print("🔧 Reconciling teacher statistics...")
+        updated = TeacherStatsService.update_all_teacher_statistics(
+            db, progress=lambda done, total: print(f"   {done}/{total} teachers")
+        )
+        print(f"✅ Reconciled statistics for {updated} teachers")
+        return True
+    except Exception as e:
+        print(f"❌ Error reconciling teacher statistics: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if reconcile_teacher_statistics() else 1)
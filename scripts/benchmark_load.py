@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Latency of authenticated API reads under concurrency (p50/p95/p99).
+
+Run against a live server, once per revision being compared:
+
+    python scripts/benchmark_load.py --url http://localhost:8000 --token "$TOKEN" \\
+        --path /students/ --path /groups/ --concurrency 64 --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(url: str, token: str, paths: list, concurrency: int, total: int) -> dict:
+    latencies = {path: [] for path in paths}
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in counter:
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies[path].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return {"latencies": latencies, "errors": errors, "elapsed": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API read latency under concurrency")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default="", help="bearer token for the authenticated routes")
+    parser.add_argument("--path", action="append", dest="paths", help="path to request (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    paths = args.paths or ["/students/", "/groups/", "/teachers/"]
+
+    result = asyncio.run(run(args.url, args.token, paths, args.concurrency, args.requests))
+    print(f"📊 {args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.requests / result['elapsed']:.0f} req/s, {result['errors']} errors")
+    for path, samples in result["latencies"].items():
+        ms = [s * 1000 for s in samples]
+        print(f"   {path}: p50 {statistics.median(ms):.1f}ms  p95 {percentile(ms, 95):.1f}ms  "
+              f"p99 {percentile(ms, 99):.1f}ms  max {max(ms):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
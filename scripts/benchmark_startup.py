@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Measure the cold import time and memory of the API module, as paid by every worker.
+
+Each run imports the module in a fresh interpreter. To compare two revisions, check
+one out elsewhere (e.g. `git worktree add /tmp/before <rev>`) and pass --repo:
+
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --repo /tmp/before
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": sorted(m for m in ("reportlab", "matplotlib") if m in sys.modules),
+}}))
+"""
+
+
+def measure(repo: str, module: str) -> dict:
+    # Import only; nothing connects to DATABASE_URL at import time
+    env = {**os.environ, "DATABASE_URL": os.environ.get("DATABASE_URL", "postgresql+psycopg2://bench@localhost/bench")}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=repo, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold import of the API")
+    parser.add_argument("--repo", default=os.path.join(os.path.dirname(__file__), ".."), help="checkout to measure")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [measure(args.repo, args.module) for _ in range(args.runs)]
+    seconds = [s["seconds"] for s in samples]
+    print(f"📊 import {args.module} ({os.path.abspath(args.repo)}, {args.runs} runs)")
+    print(f"   median {statistics.median(seconds):.3f}s, min {min(seconds):.3f}s, max {max(seconds):.3f}s")
+    print(f"   max RSS {statistics.median(s['max_rss_mb'] for s in samples):.0f} MB")
+    print(f"   heavy modules loaded: {', '.join(samples[0]['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
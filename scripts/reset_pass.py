@@ -3,7 +3,12 @@ from app.models.models import Admin
 from app.utils.auth import pwd_context
 
 def reset_password(username: str, new_password: str):
-    """Reset password for a specific user"""
+    """Reset password for a specific user.
+
+    Running API workers keep their cached admin rows (the AdminCache is per
+    process) for up to ADMIN_CACHE_TTL_SECONDS, so /auth/change-password may
+    still check the old hash until then; restart the API to apply it at once.
+    """
     db = SessionLocal()
     try:
         # Hash the new password
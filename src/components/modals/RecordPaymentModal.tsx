@@ -10,7 +10,7 @@ import { Switch } from "@/components/ui/switch";
 import { useToast } from "@/hooks/use-toast";
 import { useTranslation } from "@/hooks/useTranslation";
 import { CreditCard, DollarSign, Calendar, Eye, Printer } from "lucide-react";
-import { paymentsApi, groupsApi, studentsApi, subjectsApi } from "@/lib/api";
+import { paymentsApi, groupsApi, studentsApi, subjectsApi, jobsApi } from "@/lib/api";
 
 interface RecordPaymentModalProps {
   open: boolean;
@@ -183,6 +183,8 @@ const RecordPaymentModal = ({ open, onOpenChange, initialGroupId, initialStudent
     let receiptPath = '';
     if (created && created.id) {
       try {
+        // The receipt is rendered in the background; wait for its job before asking for the file
+        if (created.job_id) await jobsApi.waitFor(created.job_id);
         const r = await paymentsApi.receipt(created.id);
         if (r && r.path) receiptPath = r.path;
       } catch {}
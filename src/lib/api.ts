@@ -29,6 +29,24 @@ const AUTH_TOKEN_KEY = 'authToken';
 const LAST_ACTIVITY_KEY = 'lastActivity';
 const INACTIVITY_LIMIT_MS = 30 * 60 * 1000; // 30 minutes instead of 5 minutes
 
+// Read-your-writes: echo the server's X-Last-Write so reads right after a write skip the replica
+const LAST_WRITE_KEY = 'lastWrite';
+const LAST_WRITE_HEADER = 'X-Last-Write';
+
+function rememberLastWrite(res: Response): void {
+  const value = res.headers.get(LAST_WRITE_HEADER);
+  if (value) {
+    try { localStorage.setItem(LAST_WRITE_KEY, value); } catch {}
+  }
+}
+
+function addLastWrite(headers: Record<string, string>): void {
+  try {
+    const value = localStorage.getItem(LAST_WRITE_KEY);
+    if (value) headers[LAST_WRITE_HEADER] = value;
+  } catch {}
+}
+
 function getAuthToken(): string | null {
   try { return localStorage.getItem(AUTH_TOKEN_KEY); } catch { return null; }
 }
@@ -96,6 +114,7 @@ export async function apiRequest<T = any>(path: string, opts: RequestInit = {}):
     headers['Content-Type'] = headers['Content-Type'] || 'application/json';
   }
   if (token) headers['Authorization'] = `Bearer ${token}`;
+  addLastWrite(headers);
   
   const method = (opts.method || 'GET').toUpperCase();
   
@@ -137,6 +156,7 @@ export async function apiRequest<T = any>(path: string, opts: RequestInit = {}):
     headers,
     cache: 'no-store',
   });
+  rememberLastWrite(res);
   
   if (res.status === 401) {
     console.warn('Received 401 Unauthorized - clearing auth data');
@@ -175,6 +195,38 @@ export async function apiRequest<T = any>(path: string, opts: RequestInit = {}):
   return textData;
 }
 
+const LIST_PAGE_SIZE = 500;
+
+// Load every page of a keyset-paginated list endpoint by following X-Next-Cursor
+export async function apiRequestAll<T = any>(path: string): Promise<T[]> {
+  const token = getAuthToken();
+  const headers: Record<string, string> = { 'Cache-Control': 'no-store, no-cache, must-revalidate' };
+  if (token) headers['Authorization'] = `Bearer ${token}`;
+  addLastWrite(headers);
+
+  const sep = path.includes('?') ? '&' : '?';
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const after = cursor ? `&after=${encodeURIComponent(cursor)}` : '';
+    const res = await fetch(`${API_BASE}${path}${sep}limit=${LIST_PAGE_SIZE}${after}`, { headers, cache: 'no-store' });
+    if (res.status === 401) {
+      clearAuthData();
+      if (typeof window !== 'undefined' && !window.location.pathname.includes('/auth/login')) {
+        window.location.href = '/auth/login';
+      }
+      throw new Error('Unauthorized');
+    }
+    if (!res.ok) {
+      const text = await res.text().catch(()=> '');
+      throw new Error(`API ${res.status} ${res.statusText}: ${text}`);
+    }
+    items.push(...(await res.json()));
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}
+
 export async function loginBackend(username: string, password: string): Promise<{ access_token: string; token_type?: string; username?: string; }>{
   console.log('Attempting login with:', { username, API_BASE });
   
@@ -268,10 +320,11 @@ export const eventsApi = {
 
 export const paymentsApi = {
   async list(): Promise<any[]> {
-    return apiRequest('/payments/');
+    return apiRequestAll('/payments/');
   },
+  // Returns the created payment; its job_id is the queued receipt PDF job (paid payments only)
   async create(data: { student_id: number; amount: number; date: string; method?: string | null; status?: 'paid'|'unpaid' }): Promise<any> {
-    await apiRequest('/payments/', { method: 'POST', body: JSON.stringify({
+    const result = await apiRequest('/payments/', { method: 'POST', body: JSON.stringify({
       student_id: data.student_id,
       amount: data.amount,
       date: data.date,
@@ -279,7 +332,7 @@ export const paymentsApi = {
       status: data.status ?? 'paid',
     }) });
     invalidateCache('payments');
-    return {};
+    return result;
   },
   async get(id: number): Promise<any> { 
     return apiRequest(`/payments/${id}`);
@@ -299,9 +352,60 @@ export const paymentsApi = {
   }
 };
 
+export interface PdfJob {
+  id: number;
+  kind: string;
+  target_id?: number | null;
+  status: 'pending' | 'running' | 'done' | 'failed';
+  attempts: number;
+  result_path?: string | null;
+  error?: string | null;
+}
+
+// PDFs (receipts, reports, documents) are rendered by background jobs; poll before fetching the file
+export const jobsApi = {
+  async get(id: number): Promise<PdfJob> {
+    apiCache.delete(`GET:${API_BASE}/jobs/${id}`); // status changes between polls
+    return apiRequest(`/jobs/${id}`);
+  },
+  async waitFor(id: number, timeoutMs = 60000): Promise<PdfJob> {
+    const deadline = Date.now() + timeoutMs;
+    let delay = 250;
+    for (;;) {
+      const job = await jobsApi.get(id);
+      if (job.status === 'done') return job;
+      if (job.status === 'failed') throw new Error(job.error || `PDF job ${id} failed`);
+      if (Date.now() > deadline) throw new Error(`PDF job ${id} is still ${job.status}`);
+      await new Promise(resolve => setTimeout(resolve, delay));
+      delay = Math.min(delay * 2, 2000);
+    }
+  }
+};
+
+export const reportsApi = {
+  // Resolves once the report PDF exists; file_path is null until then
+  async generate(data: { type: string; period_start?: string | null; period_end?: string | null; include_graphs?: boolean; include_detailed_data?: boolean; include_advanced_analysis?: boolean }): Promise<any> {
+    const report = await apiRequest('/reports/generate', { method: 'POST', body: JSON.stringify(data) });
+    if (!report?.job_id) return report;
+    const job = await jobsApi.waitFor(report.job_id);
+    return { ...report, file_path: job.result_path };
+  }
+};
+
+export const documentsApi = {
+  // Resolves with the stored document once its PDF job has finished
+  async generate(data: { type: string; student_id?: number | null; signed?: boolean; meta?: string | null }): Promise<any> {
+    const doc = await apiRequest('/documents/generate', { method: 'POST', body: JSON.stringify(data) });
+    if (!doc?.job_id) return doc;
+    await jobsApi.waitFor(doc.job_id);
+    apiCache.delete(`GET:${API_BASE}/documents/${doc.id}`);
+    return apiRequest(`/documents/${doc.id}`);
+  }
+};
+
 export const studentsApi = {
   async list(): Promise<any[]> {
-    return apiRequest('/students/');
+    return apiRequestAll('/students/');
   },
   async get(id: number): Promise<any> { 
     return apiRequest(`/students/${id}`);
@@ -625,7 +729,7 @@ export const teachersApi = {
 
 export const attendanceApi = {
   async list(): Promise<any[]> { 
-    return apiRequest(`/attendance/?_=${Date.now()}`);
+    return apiRequestAll(`/attendance/?_=${Date.now()}`);
   },
   async create(data: { student_id: number; date: string; status: 'present'|'absent'|'late' }): Promise<any> {
     await apiRequest('/attendance/', { method: 'POST', body: JSON.stringify(data) });
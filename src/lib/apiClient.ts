@@ -15,6 +15,24 @@ const CACHE_TTL = {
 // Cache management
 const apiCache = new Map<string, { data: any; timestamp: number; ttl: number }>();
 
+// Read-your-writes: echo the server's X-Last-Write so reads right after a write skip the replica
+const LAST_WRITE_KEY = 'lastWrite';
+const LAST_WRITE_HEADER = 'X-Last-Write';
+
+function rememberLastWrite(res: Response): void {
+  const value = res.headers.get(LAST_WRITE_HEADER);
+  if (value) {
+    try { localStorage.setItem(LAST_WRITE_KEY, value); } catch {}
+  }
+}
+
+function addLastWrite(headers: Record<string, string>): void {
+  try {
+    const value = localStorage.getItem(LAST_WRITE_KEY);
+    if (value) headers[LAST_WRITE_HEADER] = value;
+  } catch {}
+}
+
 function getAuthToken(): string | null {
   try { return localStorage.getItem(AUTH_TOKEN_KEY); } catch { return null; }
 }
@@ -73,6 +91,7 @@ export const apiClient = {
       headers['Content-Type'] = headers['Content-Type'] || 'application/json';
     }
     if (token) headers['Authorization'] = `Bearer ${token}`;
+    addLastWrite(headers);
     
     const method = (opts.method || 'GET').toUpperCase();
     
@@ -98,6 +117,7 @@ export const apiClient = {
 
     try {
       const response = await fetch(`${API_BASE}${path}`, { ...opts, headers });
+      rememberLastWrite(response);
       const contentType = response.headers.get('content-type');
       
       // Parse response based on content type
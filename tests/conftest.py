@@ -1,27 +1,39 @@
+import asyncio
+from datetime import date, datetime
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import _has_writes, async_database_url, get_async_db, get_db, get_read_db
 from app.config import settings
-from app.models.models import Admin, SubscriptionPlan, Subscription, SubscriptionInvoice, UsageMetrics
-
-# Use in-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+from app.models.models import Admin, Base, SubscriptionPlan, Subscription, SubscriptionInvoice, UsageMetrics
+from app.services.subscription_cache import invalidate_subscription_cache
+from app.utils.auth import get_current_admin
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="session")
+def sessionmakers(tmp_path_factory):
+    """File-backed SQLite so the sync session and the aiosqlite session see the same data."""
+    url = f"sqlite:///{tmp_path_factory.mktemp('db') / 'edumanage_test.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    yield (
+        sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    )
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
 
 @pytest.fixture(scope="function")
-def db():
+def db(sessionmakers):
     """Create a fresh database for each test."""
+    TestingSessionLocal, _ = sessionmakers
+    engine = TestingSessionLocal.kw["bind"]
+    invalidate_subscription_cache()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -31,15 +43,35 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(db, sessionmakers):
     """Create a test client using the test database."""
+    _, TestingAsyncSessionLocal = sessionmakers
+
     def override_get_db():
         try:
             yield db
         finally:
             db.close()
 
+    async def override_get_async_db():
+        # Same commit/rollback handling as get_async_db
+        async with TestingAsyncSessionLocal() as session:
+            try:
+                yield session
+                if _has_writes(session.sync_session):
+                    await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    def override_get_current_admin():
+        # Route tests run as the test admin when one exists
+        return db.query(Admin).first() or Admin(username="test-admin", hashed_password="x")
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_admin] = override_get_current_admin
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -47,9 +79,8 @@ def client(db):
 def test_admin(db):
     """Create a test admin user."""
     admin = Admin(
-        email="test@example.com",
+        username="test@example.com",
         hashed_password="hashed_password",
-        is_active=True
     )
     db.add(admin)
     db.commit()
@@ -82,8 +113,8 @@ def test_subscription(db, test_admin, test_plan):
         admin_id=test_admin.id,
         plan_id=test_plan.id,
         status="active",
-        start_date="2024-01-01",
-        end_date="2024-12-31",
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 12, 31),
         auto_renew=True
     )
     db.add(subscription)
@@ -98,7 +129,7 @@ def test_invoice(db, test_subscription):
         subscription_id=test_subscription.id,
         amount=99.99,
         status="pending",
-        billing_date="2024-01-01",
+        billing_date=date(2024, 1, 1),
         invoice_number="INV-TEST-001"
     )
     db.add(invoice)
@@ -113,20 +144,20 @@ def test_metrics(db, test_subscription):
         UsageMetrics(
             subscription_id=test_subscription.id,
             metric_type="students",
-            value=50,
-            date="2024-01-01"
+            quantity=50,
+            timestamp=datetime(2024, 1, 1)
         ),
         UsageMetrics(
             subscription_id=test_subscription.id,
             metric_type="teachers",
-            value=5,
-            date="2024-01-01"
+            quantity=5,
+            timestamp=datetime(2024, 1, 1)
         ),
         UsageMetrics(
             subscription_id=test_subscription.id,
             metric_type="courses",
-            value=10,
-            date="2024-01-01"
+            quantity=10,
+            timestamp=datetime(2024, 1, 1)
         )
     ]
     for metric in metrics:
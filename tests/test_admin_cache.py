@@ -0,0 +1,56 @@
+from app.models.models import Admin
+from app.utils.auth import AdminCache
+
+
+def _admin(id=1, username="admin"):
+    return Admin(id=id, username=username, hashed_password="hashed_password")
+
+
+def test_cache_returns_detached_copy():
+    """Hits return a new object carrying the cached column values."""
+    cache = AdminCache(ttl_seconds=60, max_entries=10)
+    original = _admin()
+    cache.put("token-a", original)
+
+    cached = cache.get("token-a")
+    assert cached is not original
+    assert cached.id == 1
+    assert cached.username == "admin"
+
+
+def test_cache_is_bounded():
+    """The least recently used token is evicted once the cache is full."""
+    cache = AdminCache(ttl_seconds=60, max_entries=2)
+    cache.put("token-a", _admin(1, "a"))
+    cache.put("token-b", _admin(2, "b"))
+    cache.get("token-a")
+    cache.put("token-c", _admin(3, "c"))
+
+    assert cache.get("token-b") is None
+    assert cache.get("token-a") is not None
+    assert cache.get("token-c") is not None
+
+
+def test_cache_expires(monkeypatch):
+    """Entries older than the TTL are ignored."""
+    import app.utils.auth as auth_module
+
+    now = [1000.0]
+    monkeypatch.setattr(auth_module.time, "monotonic", lambda: now[0])
+    cache = AdminCache(ttl_seconds=60, max_entries=10)
+    cache.put("token-a", _admin())
+    assert cache.get("token-a") is not None
+
+    now[0] += 61
+    assert cache.get("token-a") is None
+
+
+def test_invalidate_by_username():
+    """Invalidation only drops tokens belonging to the given admin."""
+    cache = AdminCache(ttl_seconds=60, max_entries=10)
+    cache.put("token-a", _admin(1, "a"))
+    cache.put("token-b", _admin(2, "b"))
+
+    cache.invalidate("a")
+    assert cache.get("token-a") is None
+    assert cache.get("token-b") is not None
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import async_database_url
+from app.models.models import Admin, Base, Student
+from app.utils.auth import admin_cache, create_access_token, get_current_admin
+from app.utils.pagination import NEXT_CURSOR_HEADER, PageParams, paginate_async
+
+
+@pytest.fixture
+def async_session_factory(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(Admin.__table__.insert(), [{"username": "alice", "hashed_password": "x"}])
+        conn.execute(Student.__table__.insert(), [{"full_name": f"Student {i}", "status": "active"} for i in range(5)])
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(async_database_url(url))
+    yield async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+
+
+def test_async_database_url():
+    assert async_database_url("postgresql+psycopg2://u:p@db/edu") == "postgresql+asyncpg://u:p@db/edu"
+    assert async_database_url("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+
+
+def test_paginate_async(async_session_factory):
+    """Keyset pagination over an AsyncSession matches the sync helper."""
+    async def pages():
+        async with async_session_factory() as db:
+            first_response = Response()
+            first = await paginate_async(db, select(Student), Student.id, PageParams(after=None, limit=3), first_response)
+            cursor = first_response.headers[NEXT_CURSOR_HEADER]
+            last_response = Response()
+            last = await paginate_async(db, select(Student), Student.id, PageParams(after=cursor, limit=3), last_response)
+            return first, last, last_response
+
+    first, last, last_response = asyncio.run(pages())
+    assert [s.id for s in first] == [5, 4, 3]
+    assert [s.id for s in last] == [2, 1]
+    assert NEXT_CURSOR_HEADER not in last_response.headers
+
+
+def test_get_current_admin_async(async_session_factory, monkeypatch):
+    """The auth dependency resolves admins through the async session."""
+    monkeypatch.setattr(settings, "JWT_SECRET", "test-secret")
+    admin_cache.invalidate()
+
+    async def resolve(username):
+        async with async_session_factory() as db:
+            return await get_current_admin(token=create_access_token(username), db=db)
+
+    assert asyncio.run(resolve("alice")).username == "alice"
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(resolve("mallory"))
+    assert exc.value.status_code == 401
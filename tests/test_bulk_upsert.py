@@ -0,0 +1,89 @@
+from app.models.models import Student, Group, StudentGrade
+from app.routes.subject_grades import GRADE_UPSERT_KEY
+from app.utils.upsert import upsert_returning
+
+
+def _grade_rows(student_id, group_id, grade, count=3):
+    return [
+        dict(student_id=student_id, group_id=group_id, subject="Math", exam_name=f"Exam {i}",
+             grade=grade, coefficient=2.0, semester="S1")
+        for i in range(count)
+    ]
+
+
+def test_grade_upsert_inserts_then_updates(db):
+    """A second upsert on the same key updates rows in place instead of duplicating them."""
+    group = Group(name="Group A")
+    student = Student(full_name="Student A")
+    db.add_all([group, student])
+    db.commit()
+
+    first = upsert_returning(db, StudentGrade, _grade_rows(student.id, group.id, 10.0),
+                             GRADE_UPSERT_KEY, ("group_id", "grade", "coefficient"))
+    db.commit()
+    second = upsert_returning(db, StudentGrade, _grade_rows(student.id, group.id, 15.0),
+                              GRADE_UPSERT_KEY, ("group_id", "grade", "coefficient"))
+    db.commit()
+
+    assert sorted(r.id for r in first) == sorted(r.id for r in second)
+    assert all(r.grade == 15.0 for r in second)
+    assert db.query(StudentGrade).count() == 3
+
+
+def _count_queries(db, fn):
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def test_record_results_query_count_is_constant(db):
+    """Recording results issues the same number of queries for 5 or 40 students."""
+    from datetime import date
+    from app.models.models import Course, Exam, ExamResult
+    from app.routes.exams import record_results
+    from app.schemas import RecordResultsRequest, ExamResultCreate
+
+    group = Group(name="Group A")
+    db.add(group)
+    db.commit()
+    course = Course(name="Math", group_id=group.id)
+    db.add(course)
+    db.commit()
+    students = [Student(full_name=f"Student {i}", group_id=group.id) for i in range(40)]
+    db.add_all(students)
+    small_exam = Exam(course_id=course.id, group_id=group.id, exam_date=date(2024, 1, 1), max_score=20)
+    large_exam = Exam(course_id=course.id, group_id=group.id, exam_date=date(2024, 1, 2), max_score=20)
+    db.add_all([small_exam, large_exam])
+    db.commit()
+
+    student_ids = [s.id for s in students]
+    small_id, large_id = small_exam.id, large_exam.id
+
+    def payload(exam_id, count, score):
+        return RecordResultsRequest(results=[
+            ExamResultCreate(exam_id=exam_id, student_id=sid, score=score) for sid in student_ids[:count]
+        ])
+
+    small_payload, large_payload = payload(small_id, 5, 12), payload(large_id, 40, 12)
+    db.expire_all()
+    small = _count_queries(db, lambda: record_results(small_id, small_payload, db))
+    db.expire_all()
+    large = _count_queries(db, lambda: record_results(large_id, large_payload, db))
+    assert small == large
+
+    # Re-recording updates in place
+    saved = record_results(large_id, payload(large_id, 40, 17), db)
+    assert len(saved) == 40
+    assert all(r.score == 17 for r in saved)
+    assert db.query(ExamResult).filter(ExamResult.exam_id == large_id).count() == 40
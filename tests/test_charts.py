@@ -0,0 +1,25 @@
+from app.utils import charts
+
+
+def test_render_line_chart_returns_png():
+    """Charts are rendered to in-memory PNG bytes."""
+    png = charts.render_line_chart("Trend", [1, 3, 2], labels=["a", "b", "c"])
+    assert png.startswith(b"\x89PNG")
+
+
+def test_render_line_chart_is_cached(monkeypatch):
+    """Identical chart data is rendered only once."""
+    calls = []
+    real_render = charts._render_line_chart
+
+    def counting_render(*args):
+        calls.append(args)
+        return real_render(*args)
+
+    monkeypatch.setattr(charts, "_render_line_chart", counting_render)
+    first = charts.render_line_chart("Cached trend", [5, 6, 7])
+    second = charts.render_line_chart("Cached trend", [5, 6, 7])
+    charts.render_line_chart("Cached trend", [5, 6, 8])
+
+    assert first is second
+    assert len(calls) == 2
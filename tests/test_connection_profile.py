@@ -0,0 +1,41 @@
+from app import database
+from app.config import Settings, settings
+
+
+def test_pool_is_split_across_workers():
+    assert Settings(DATABASE_URL="sqlite://", DB_MAX_CONNECTIONS=30, DB_ASYNC_POOL_SHARE=0).get_pool_limits() == (20, 10)
+    assert Settings(DATABASE_URL="sqlite://", DB_MAX_CONNECTIONS=30, WEB_CONCURRENCY=3, DB_ASYNC_POOL_SHARE=0).get_pool_limits() == (6, 4)
+    assert Settings(DATABASE_URL="sqlite://", DB_MAX_CONNECTIONS=4, WEB_CONCURRENCY=8).get_pool_limits() == (1, 0)
+    assert Settings(DATABASE_URL="sqlite://", DB_POOL_SIZE=5, DB_MAX_OVERFLOW=2).get_pool_limits() == (5, 2)
+
+
+def test_primary_budget_is_shared_by_sync_and_async_engines():
+    profile = Settings(DATABASE_URL="sqlite://", DB_MAX_CONNECTIONS=40, WEB_CONCURRENCY=2, DB_ASYNC_POOL_SHARE=0.25)
+    assert profile.get_pool_limits("sync") == (10, 5)
+    assert profile.get_pool_limits("async") == (3, 2)
+    assert 2 * (sum(profile.get_pool_limits("sync")) + sum(profile.get_pool_limits("async"))) == 40
+
+    replica = Settings(DATABASE_URL="sqlite://", DB_REPLICA_MAX_CONNECTIONS=12, WEB_CONCURRENCY=2)
+    assert replica.get_pool_limits("replica") == (4, 2)
+
+
+def test_connection_options_by_environment():
+    assert Settings(DATABASE_URL="sqlite://", DB_STATEMENT_TIMEOUT_MS=5000).get_connection_options() == {
+        "timezone": "UTC", "statement_timeout": "5000",
+    }
+    assert "work_mem" in Settings(DATABASE_URL="sqlite://", ENVIRONMENT="production").get_connection_options()
+
+
+def test_engine_options_send_settings_at_connect(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1234)
+
+    sync = database.engine_options("postgresql+psycopg2://u@db/edu")
+    assert "-c statement_timeout=1234" in sync["connect_args"]["options"]
+    assert "-c timezone=UTC" in sync["connect_args"]["options"]
+    assert (sync["pool_size"], sync["max_overflow"]) == settings.get_pool_limits()
+
+    async_ = database.engine_options("postgresql+asyncpg://u@db/edu", "async")
+    assert async_["connect_args"]["server_settings"]["statement_timeout"] == "1234"
+    assert (async_["pool_size"], async_["max_overflow"]) == settings.get_pool_limits("async")
+
+    assert database.engine_options("sqlite://") == {}
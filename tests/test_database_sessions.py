@@ -0,0 +1,114 @@
+import logging
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, update
+from sqlalchemy.pool import QueuePool
+
+from app import database
+from app.config import settings
+from app.models.models import Group
+
+
+def test_write_tracking(db):
+    """Only sessions that wrote something are reported as needing a commit."""
+    db.query(Group).all()
+    assert not database._has_writes(db)
+
+    db.add(Group(name="G1"))
+    assert database._has_writes(db)
+    db.commit()
+    assert not database._has_writes(db)
+
+    db.execute(update(Group).values(capacity=30))
+    assert database._has_writes(db)
+    db.rollback()
+    assert not database._has_writes(db)
+
+
+def test_get_db_skips_commit_for_reads(db, monkeypatch):
+    commits = []
+    monkeypatch.setattr(database, "SessionLocal", lambda: db)
+    monkeypatch.setattr(db, "commit", lambda: commits.append(True))
+
+    session_gen = database.get_db()
+    next(session_gen).query(Group).all()
+    next(session_gen, None)
+    assert commits == []
+
+    session_gen = database.get_db()
+    next(session_gen).add(Group(name="G2"))
+    next(session_gen, None)
+    assert commits == [True]
+
+
+def test_slow_sessions_are_sampled(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_SLOW_SESSION_MS", 100)
+    monkeypatch.setattr(database.time, "perf_counter", lambda: 10.0)
+    caplog.set_level(logging.WARNING, logger="app.database")
+
+    database._log_if_slow(10.0 - 0.05, "read-only")
+    assert not caplog.records
+
+    monkeypatch.setattr(settings, "DB_SLOW_SESSION_LOG_SAMPLE_RATE", 0.0)
+    database._log_if_slow(10.0 - 0.5, "read-only")
+    assert not caplog.records
+
+    monkeypatch.setattr(settings, "DB_SLOW_SESSION_LOG_SAMPLE_RATE", 1.0)
+    database._log_if_slow(10.0 - 0.5, "read-only")
+    assert "Slow read-only database session: 500ms" in caplog.text
+
+
+def test_pool_metrics_counts_events():
+    metrics = database.PoolMetrics()
+    metrics.incr("checkouts")
+    metrics.incr("checkouts")
+    metrics.incr("checkins")
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checkins"] == 1
+    assert snapshot["connects"] == 0
+
+
+def test_pool_metrics_watch_every_engine():
+    metrics = database.PoolMetrics()
+    primary = create_engine("sqlite://", poolclass=QueuePool)
+    replica = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.watch(primary, "primary")
+    metrics.watch(replica, "replica")
+    with primary.connect(), replica.connect():
+        snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["pools"]["replica"]["checked_out"] == 1
+    primary.dispose()
+    replica.dispose()
+
+
+def test_http_errors_are_not_logged_as_session_failures(db, monkeypatch, caplog):
+    monkeypatch.setattr(database, "SessionLocal", lambda: db)
+    caplog.set_level(logging.ERROR, logger="app.database")
+
+    session_gen = database.get_db()
+    next(session_gen)
+    with pytest.raises(HTTPException):
+        session_gen.throw(HTTPException(status_code=404, detail="Not found"))
+    assert not caplog.records
+
+
+def test_savepoints_keep_outer_writes(db):
+    """Ending a SAVEPOINT does not hide writes still pending in the outer transaction."""
+    db.add(Group(name="G1"))
+    db.flush()
+
+    savepoint = db.begin_nested()
+    db.execute(update(Group).values(capacity=30))
+    savepoint.rollback()
+    assert database._has_writes(db)
+
+    savepoint = db.begin_nested()
+    db.add(Group(name="G2"))
+    savepoint.commit()
+    assert database._has_writes(db)
+
+    db.commit()
+    assert not database._has_writes(db)
@@ -0,0 +1,35 @@
+import csv
+import gzip
+import io
+import json
+
+from app.models.models import Group, Student
+from app.utils.export import gzip_chunks, iter_export
+
+
+def _students(db, count):
+    group = Group(name="G1")
+    db.add(group)
+    db.commit()
+    db.add_all([Student(full_name=f"Student {i}", group_id=group.id) for i in range(count)])
+    db.commit()
+
+
+def test_csv_export_streams_in_batches(db):
+    """CSV is emitted as a header chunk plus one chunk per batch."""
+    _students(db, 5)
+    chunks = list(iter_export(db, Student, "csv", batch_size=2))
+    assert len(chunks) == 1 + 3
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert [r["full_name"] for r in rows] == [f"Student {i}" for i in range(5)]
+    assert rows[0]["status"] == "active"
+
+
+def test_ndjson_export_gzip(db):
+    """NDJSON output survives a gzip round trip, one object per line."""
+    _students(db, 3)
+    body = gzip.decompress(b"".join(gzip_chunks(iter_export(db, Student, "ndjson", batch_size=2))))
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert [line["full_name"] for line in lines] == ["Student 0", "Student 1", "Student 2"]
+    assert set(lines[0]) == {c.key for c in Student.__table__.columns}
@@ -0,0 +1,42 @@
+import pytest
+from app.config import settings
+from app.models.models import Student, Group, StudentGrade
+from app.services.grade_average_service import GradeAverageService
+
+
+@pytest.fixture
+def graded_group(db):
+    group = Group(name="Group A")
+    db.add(group)
+    db.commit()
+    graded = Student(full_name="Alice", group_id=group.id)
+    ungraded = Student(full_name="Bob", group_id=group.id)
+    db.add_all([graded, ungraded])
+    db.commit()
+    for subject, coefficient, grades in [("Math", 3.0, [10.0, 14.0]), ("French", 1.0, [16.0])]:
+        for i, grade in enumerate(grades):
+            db.add(StudentGrade(student_id=graded.id, group_id=group.id, subject=subject,
+                                exam_name=f"Exam {i}", grade=grade, coefficient=coefficient, semester="S1"))
+    db.commit()
+    return group
+
+
+def _check(result):
+    alice, bob = result
+    assert alice.full_name == "Alice"
+    assert {s.subject: s.average for s in alice.subjects} == {"French": 16.0, "Math": 12.0}
+    assert alice.sum_coefficients == 4.0
+    assert alice.average == pytest.approx((12.0 * 3 + 16.0) / 4)
+    assert bob.subjects == [] and bob.average is None
+
+
+def test_averages_by_group(db, graded_group):
+    """Weighted averages are computed in SQL, students without grades included."""
+    _check(GradeAverageService.averages_by_group(db, graded_group.id, "S1"))
+
+
+def test_averages_by_group_from_summaries(db, graded_group, monkeypatch):
+    """The materialized summary table yields the same averages."""
+    monkeypatch.setattr(settings, "GRADE_SUMMARY_ENABLED", True)
+    GradeAverageService.rebuild_summaries(db)
+    _check(GradeAverageService.averages_by_group(db, graded_group.id, "S1"))
@@ -0,0 +1,129 @@
+import asyncio
+from threading import BoundedSemaphore
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import async_database_url, get_async_db, get_db
+from app.main import app
+from app.models.models import Admin, Base
+from app.utils import auth
+
+
+@pytest.fixture
+def fast_bcrypt(monkeypatch):
+    """Cheap cost factors: stored hashes use 4 rounds, the tuned target is 5."""
+    monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+    auth.login_rate_limiter.clear()
+    yield CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    auth.login_rate_limiter.clear()
+
+
+def test_rate_limiter_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(auth.time, "monotonic", lambda: now[0])
+    limiter = auth.RateLimiter(rate=2)
+
+    assert limiter.allow("k") and limiter.allow("k")
+    assert not limiter.allow("k")
+    now[0] += 0.5
+    assert limiter.allow("k")
+    assert not limiter.allow("k")
+
+
+def test_login_rate_is_per_username_and_ip(monkeypatch):
+    monkeypatch.setattr(auth, "login_rate_limiter", auth.RateLimiter(rate=2))
+
+    auth.check_login_rate("alice", "10.0.0.1")
+    auth.check_login_rate("Alice", "10.0.0.2")
+    with pytest.raises(HTTPException) as exc:
+        auth.check_login_rate("alice", "10.0.0.3")  # same username from a third address
+    assert exc.value.status_code == 429
+
+    auth.check_login_rate("bob", "10.0.0.9")
+    auth.check_login_rate("carol", "10.0.0.9")
+    with pytest.raises(HTTPException):
+        auth.check_login_rate("dave", "10.0.0.9")  # same address, new usernames
+
+
+def test_verify_and_rehash(fast_bcrypt):
+    stored = fast_bcrypt.hash("s3cret")
+    valid, new_hash = asyncio.run(auth.verify_password_async("s3cret", stored))
+    assert valid and new_hash.startswith("$2b$05$")
+    assert asyncio.run(auth.verify_password_async("wrong", stored)) == (False, None)
+    assert asyncio.run(auth.verify_password_async("s3cret", new_hash)) == (True, None)
+
+
+def test_pending_limit_sheds_load(monkeypatch):
+    monkeypatch.setattr(auth, "_hash_slots", BoundedSemaphore(1))
+    auth._hash_slots.acquire()  # the only slot is taken
+    with pytest.raises(HTTPException) as exc:
+        auth.verify_password_pooled("pw", "$2b$04$invalid")
+    assert exc.value.status_code == 503
+
+
+def test_login_upgrades_hash(tmp_path, fast_bcrypt, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_SECRET", "test-secret")
+    url = f"sqlite:///{tmp_path / 'login.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(Admin.__table__.insert().values(username="alice", hashed_password=fast_bcrypt.hash("s3cret")))
+
+    async_engine = create_async_engine(async_database_url(url))
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        assert client.post("/auth/login", data={"username": "alice", "password": "nope"}).status_code == 401
+        response = client.post("/auth/login", data={"username": "alice", "password": "s3cret"})
+        assert response.status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+    with sync_engine.connect() as conn:
+        stored = conn.execute(select(Admin.hashed_password)).scalar_one()
+    assert stored.startswith("$2b$05$")
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+
+
+def test_debug_routes_pass_through_shed_load(tmp_path, fast_bcrypt, monkeypatch):
+    """A full hash pool surfaces as 503, not as a 200 carrying an error message."""
+    monkeypatch.setattr(settings, "ADMIN_USERNAME", "admin")
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'debug.db'}")
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(Admin.__table__.insert().values(username=settings.ADMIN_USERNAME, hashed_password=fast_bcrypt.hash("x")))
+    sessions = sessionmaker(bind=sync_engine)
+
+    def override_get_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(auth, "_hash_slots", BoundedSemaphore(1))
+    auth._hash_slots.acquire()
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        assert client.post("/auth/debug/test-login").status_code == 503
+        response = client.post("/auth/debug/test-password", json={"username": settings.ADMIN_USERNAME, "password": "x"})
+        assert response.status_code == 503
+    finally:
+        app.dependency_overrides.clear()
+        sync_engine.dispose()
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from app.migrations import LATEST_VERSION, check_schema_version, current_version, run_migrations
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_is_migrated_to_latest(engine):
+    with pytest.raises(RuntimeError, match="python migrate.py"):
+        check_schema_version(engine)
+
+    assert run_migrations(engine) == list(range(1, LATEST_VERSION + 1))
+
+    assert check_schema_version(engine) == LATEST_VERSION
+    inspector = inspect(engine)
+    assert {"students", "usage_counters", "pdf_jobs", "schema_version"} <= set(inspector.get_table_names())
+    assert "ix_attendance_student_date" in {i["name"] for i in inspector.get_indexes("attendance")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM categories")).scalar() == 4
+
+
+def test_rerun_is_a_no_op(engine):
+    run_migrations(engine)
+    assert run_migrations(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM schema_version")).scalar() == LATEST_VERSION
+
+
+def test_target_stops_early_and_resumes(engine):
+    assert run_migrations(engine, target=2) == [1, 2]
+    with engine.connect() as conn:
+        assert current_version(conn) == 2
+    assert run_migrations(engine) == list(range(3, LATEST_VERSION + 1))
+
+
+def test_legacy_tables_gain_missing_columns(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE institution_settings (id INTEGER PRIMARY KEY, name VARCHAR)"))
+        conn.execute(text("CREATE TABLE teachers (id INTEGER PRIMARY KEY, full_name VARCHAR)"))
+        conn.execute(text("CREATE TABLE teacher_statistics (id INTEGER PRIMARY KEY, teacher_id INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO teacher_statistics (id, teacher_id) VALUES (1, 7), (2, 7), (3, 8)"))
+
+    run_migrations(engine)
+
+    inspector = inspect(engine)
+    assert {"language", "grading_scale", "updated_at"} <= {c["name"] for c in inspector.get_columns("institution_settings")}
+    assert {"rating_sum", "helpfulness_count"} <= {c["name"] for c in inspector.get_columns("teacher_statistics")}
+    with engine.connect() as conn:
+        # Duplicate rows are collapsed to the latest before the unique key is created
+        assert conn.execute(text("SELECT id FROM teacher_statistics ORDER BY id")).scalars().all() == [2, 3]
+
+
+def test_failed_migration_is_not_recorded(engine, monkeypatch):
+    from app import migrations
+
+    def broken(conn):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [migrations.Migration(LATEST_VERSION + 1, "broken", broken)])
+    with pytest.raises(RuntimeError, match="boom"):
+        run_migrations(engine, target=LATEST_VERSION + 1)
+
+    with engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+
+
+def test_legacy_ddl_overrides_model_definition(engine):
+    from app.migrations import _add_missing_columns
+    from app.models.models import InstitutionSettings
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE institution_settings (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO institution_settings (id) VALUES (1)"))
+        _add_missing_columns(conn, InstitutionSettings.__table__, ["dark_mode", "language"],
+                             legacy_ddl={"dark_mode": "BOOLEAN DEFAULT FALSE"})
+        # The legacy default backfills existing rows; the model's column has none
+        assert conn.execute(text("SELECT dark_mode, language FROM institution_settings")).one() == (0, None)
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import HTTPException, Response
+
+from app.models.models import Student
+from app.utils.pagination import PageParams, paginate, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+
+
+def test_cursor_round_trip():
+    """Cursors decode back to the id they were built from."""
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+def test_decode_invalid_cursor():
+    """Garbage cursors are rejected with a 400."""
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+def test_paginate_walks_all_pages(db):
+    """Following X-Next-Cursor yields every row exactly once, newest first."""
+    for i in range(7):
+        db.add(Student(full_name=f"Student {i}"))
+    db.commit()
+
+    seen = []
+    after = None
+    while True:
+        response = Response()
+        rows = paginate(db.query(Student), Student.id, PageParams(after=after, limit=3), response)
+        seen.extend(r.id for r in rows)
+        after = response.headers.get(NEXT_CURSOR_HEADER)
+        if not after:
+            break
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == len(set(seen)) == 7
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from app.config import settings
+from app.models.models import Payment, PdfJob, Student
+from app.services import pdf_jobs
+from app.services.pdf_jobs import PdfJobService
+
+
+@pytest.fixture(autouse=True)
+def inline_jobs(monkeypatch):
+    """Render jobs in-process so they finish before enqueue returns."""
+    monkeypatch.setattr(settings, "PDF_JOB_WORKERS", 0)
+    monkeypatch.setattr(settings, "PDF_JOB_MAX_ATTEMPTS", 2)
+
+
+def test_job_writes_result_to_target(db, monkeypatch):
+    """A finished receipt job stores its path on the payment."""
+    monkeypatch.setattr(pdf_jobs, "render_pdf", lambda kind, params: f"/tmp/{kind}_{params['payment']['id']}.pdf")
+    student = Student(full_name="Student A")
+    db.add(student)
+    db.commit()
+    payment = Payment(student_id=student.id, amount=100.0, date=date(2024, 1, 1), status="paid")
+    db.add(payment)
+    db.commit()
+
+    job = PdfJobService.enqueue(db, "receipt", {"student_name": "Student A", "payment": {"id": payment.id}},
+                                target_id=payment.id)
+
+    assert job.status == "done"
+    assert job.result_path == f"/tmp/receipt_{payment.id}.pdf"
+    assert db.get(Payment, payment.id).receipt_path == job.result_path
+
+
+def test_job_retries_then_fails(db, monkeypatch):
+    """Failing renders are retried up to max_attempts, then marked failed."""
+    calls = []
+
+    def failing_render(kind, params):
+        calls.append(kind)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(pdf_jobs, "render_pdf", failing_render)
+    job = PdfJobService.enqueue(db, "document", {})
+
+    assert len(calls) == 2
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert "boom" in job.error
+
+
+def test_resume_claims_only_stale_jobs(db, monkeypatch):
+    """Resume skips jobs a live worker dispatched recently and keeps attempts counting."""
+    monkeypatch.setattr(pdf_jobs, "render_pdf", lambda kind, params: f"/tmp/{kind}.pdf")
+    stale_at = datetime.utcnow() - timedelta(seconds=settings.PDF_JOB_STALE_SECONDS + 60)
+    stale = PdfJob(kind="document", status="running", params={}, attempts=1, max_attempts=2, heartbeat_at=stale_at)
+    exhausted = PdfJob(kind="document", status="running", params={}, attempts=2, max_attempts=2, heartbeat_at=stale_at)
+    live = PdfJob(kind="document", status="running", params={}, attempts=1, max_attempts=2, heartbeat_at=datetime.utcnow())
+    db.add_all([stale, exhausted, live])
+    db.commit()
+
+    assert PdfJobService.resume_unfinished(db) == 2
+
+    db.refresh(stale)
+    db.refresh(exhausted)
+    db.refresh(live)
+    assert (stale.status, stale.attempts) == ("done", 2)
+    assert (exhausted.status, exhausted.attempts) == ("failed", 2)
+    assert (live.status, live.attempts) == ("running", 1)
+    assert PdfJobService.resume_unfinished(db) == 0
+
+
+def test_failed_submit_leaves_job_resumable(db, monkeypatch):
+    """A job the pool refuses is left pending rather than stuck in running."""
+    monkeypatch.setattr(settings, "PDF_JOB_WORKERS", 1)
+
+    def refuse(kind, params):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(PdfJobService, "_submit", staticmethod(refuse))
+    job = PdfJobService.enqueue(db, "document", {})
+
+    assert job.status == "pending"
+    assert job.attempts == 0
+    assert job.heartbeat_at is None
+    assert "shutdown" in job.error
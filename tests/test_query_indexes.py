@@ -0,0 +1,112 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+from app.models.models import (
+    Admin, Course, Feedback, Group, Student, Subscription, SubscriptionPlan, Teacher,
+)
+from app.services.report_metrics import ReportMetricsService
+from app.services.subscription_cache import get_active_subscription
+from app.services.teacher_stats_service import TeacherStatsService
+from app.services.usage import UsageService
+
+
+@pytest.fixture
+def captured(db):
+    """SELECT statements (SQL, parameters) sent to the test database."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not statement.startswith("EXPLAIN"):
+            statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", capture)
+    yield statements
+    event.remove(bind, "before_cursor_execute", capture)
+
+
+@pytest.fixture
+def data(db):
+    group = Group(name="G1")
+    teacher = Teacher(full_name="T1")
+    admin = Admin(username="owner", hashed_password="x")
+    plan = SubscriptionPlan(name="Plan", price=1.0, billing_interval="monthly", features=[], max_students=100)
+    db.add_all([group, teacher, admin, plan])
+    db.commit()
+    course = Course(name="Math", teacher_id=teacher.id, group_id=group.id)
+    student = Student(full_name="S1", group_id=group.id)
+    db.add_all([course, student])
+    db.commit()
+    db.add(Feedback(course_id=course.id, teacher_id=teacher.id, rating=4))
+    db.add(Subscription(admin_id=admin.id, plan_id=plan.id, status="active",
+                        start_date=date(2024, 1, 1), end_date=date(2030, 1, 1),
+                        current_period_start=datetime(2024, 1, 1), current_period_end=datetime(2030, 1, 1)))
+    db.commit()
+    return {"group": group.id, "teacher": teacher.id, "admin": admin.id, "student": student.id}
+
+
+def _plan(db, statement, parameters) -> str:
+    """SQLite EXPLAIN QUERY PLAN for a captured statement, as one string."""
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+HOT_PATHS = [
+    # (description, call into the real route/service, text identifying its statement, index expected in the plan)
+    ("attendance upsert lookup",
+     lambda client, db, ids: client.post("/attendance/", json={"student_id": ids["student"], "date": "2024-01-01", "status": "present"}),
+     "attendance.date = ?",
+     "ix_attendance_student_date"),
+    ("grades by group/subject/semester",
+     lambda client, db, ids: client.get(f"/subject-grades/by-group-subject?group_id={ids['group']}&subject=Math&semester=S1"),
+     "student_grades.subject = ?",
+     "ix_student_grades_group_subject_semester"),
+    ("grades by student",
+     lambda client, db, ids: client.get(f"/subject-grades/by-student?student_id={ids['student']}&semester=S1"),
+     "student_grades.student_id = ?",
+     "sqlite_autoindex_student_grades"),  # uq_student_grades_key
+    ("exam results joined to exams in a period",
+     lambda client, db, ids: ReportMetricsService.compute(db, "student_performance", date(2024, 1, 1), date(2024, 6, 30)),
+     "FROM exam_results JOIN exams",
+     "sqlite_autoindex_exam_results"),  # uq_exam_results_exam_student
+    ("feedback aggregates of a teacher",
+     lambda client, db, ids: TeacherStatsService.calculate_teacher_stats(db, ids["teacher"]),
+     "FROM feedback",
+     "ix_feedback_teacher_id"),
+    ("timetable of a group",
+     lambda client, db, ids: client.get(f"/timetable/group/{ids['group']}"),
+     "FROM timetable",
+     "ix_timetable_group_day"),
+    ("payments by status",
+     lambda client, db, ids: client.get("/payments/?status=unpaid"),
+     "payments.status = ?",
+     "ix_payments_status"),
+    ("usage in billing period",
+     lambda client, db, ids: UsageService.reserve_usage(db, ids["admin"], "students"),
+     "FROM usage_metrics",
+     "ix_usage_metrics_subscription_metric_ts"),
+    ("active subscription of an admin",
+     lambda client, db, ids: get_active_subscription(db, ids["admin"]),
+     "subscriptions.status = ?",
+     "ix_subscriptions_admin_status"),
+    ("recent reports",
+     lambda client, db, ids: client.get("/reports/recent"),
+     "FROM reports",
+     "ix_reports_created_at"),
+]
+
+
+@pytest.mark.parametrize("call, marker, index", [(c, m, i) for _, c, m, i in HOT_PATHS], ids=[d for d, _, _, _ in HOT_PATHS])
+def test_hot_paths_use_indexes(client, db, data, captured, call, marker, index):
+    """The statements the routes and services actually run are served by an index, not a table scan."""
+    from app.services.subscription_cache import invalidate_subscription_cache
+    invalidate_subscription_cache()
+    captured.clear()
+
+    call(client, db, data)
+
+    matching = [(s, p) for s, p in captured if marker in s]
+    assert matching, f"no statement containing {marker!r} was run"
+    plans = [_plan(db, s, p) for s, p in matching]
+    assert any(index in plan for plan in plans), plans
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import database
+from app.models.models import Base, Group
+
+
+def _request(method: str = "GET", last_write: str | None = None) -> Request:
+    headers = [(b"x-last-write", last_write.encode())] if last_write else []
+    return Request({"type": "http", "method": method, "headers": headers, "client": ("10.0.0.1", 1)})
+
+
+def _names(session_gen) -> list:
+    db = next(session_gen)
+    try:
+        return [g.name for g in db.query(Group).order_by(Group.id)]
+    finally:
+        next(session_gen, None)
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path, monkeypatch):
+    """Two SQLite files standing in for the primary and its replica."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for bind, name in ((primary, "on primary"), (replica, "on replica")):
+        Base.metadata.create_all(bind=bind)
+        with bind.begin() as conn:
+            conn.execute(Group.__table__.insert().values(name=name))
+
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(database, "_primary_read_engine", primary)
+    monkeypatch.setattr(database, "_replica_read_engine", replica)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=primary, expire_on_commit=False))
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def test_reads_use_replica_until_client_writes(primary_and_replica):
+    assert _names(database.get_read_db(_request())) == ["on replica"]
+
+    response = Response()
+    write_gen = database.get_db(_request("POST"), response)
+    db = next(write_gen)
+    db.add(Group(name="written by alice"))
+    db.commit()
+    next(write_gen, None)
+
+    # alice echoes the header and reads her own write from the primary; other clients keep using the replica
+    last_write = response.headers[database.LAST_WRITE_HEADER]
+    assert _names(database.get_read_db(_request(last_write=last_write))) == ["on primary", "written by alice"]
+    assert _names(database.get_read_db(_request())) == ["on replica"]
+
+
+def test_read_requests_do_not_mark_clients(primary_and_replica):
+    response = Response()
+    _names(database.get_db(_request("GET"), response))
+    assert database.LAST_WRITE_HEADER not in response.headers
+
+
+def test_stickiness_expires(primary_and_replica, monkeypatch):
+    monkeypatch.setattr(database.settings, "REPLICA_STICKY_SECONDS", 5)
+    assert database._client_wrote_recently(_request(last_write=f"{time.time() - 1:.3f}"))
+    assert not database._client_wrote_recently(_request(last_write=f"{time.time() - 10:.3f}"))
+    assert not database._client_wrote_recently(_request(last_write="not a time"))
+
+
+def test_routing_session_sends_dml_to_primary(primary_and_replica):
+    primary, replica = primary_and_replica
+    db = database.RoutingSessionLocal()
+    db.execute(update(Group).values(capacity=12))
+    db.commit()
+    db.close()
+
+    with primary.connect() as conn:
+        assert conn.execute(Group.__table__.select()).first().capacity == 12
+    with replica.connect() as conn:
+        assert conn.execute(Group.__table__.select()).first().capacity is None
+
+
+def test_write_requests_send_last_write_header(primary_and_replica):
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+
+    @app.post("/groups")
+    def create_group(db=Depends(database.get_db)):
+        db.add(Group(name="posted"))
+        db.commit()
+        return {}
+
+    @app.get("/groups")
+    def list_groups(db=Depends(database.get_read_db)):
+        return [g.name for g in db.query(Group).order_by(Group.id)]
+
+    client = TestClient(app)
+    last_write = client.post("/groups").headers[database.LAST_WRITE_HEADER]
+    assert client.get("/groups", headers={database.LAST_WRITE_HEADER: last_write}).json() == ["on primary", "posted"]
+    assert client.get("/groups").json() == ["on replica"]
@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+from app.models.models import Attendance, Course, Exam, ExamResult, Group, Payment, Student
+from app.services.report_metrics import ReportMetricsService
+
+
+@pytest.fixture
+def student(db):
+    group = Group(name="G1")
+    db.add(group)
+    db.commit()
+    student = Student(full_name="Alice", group_id=group.id)
+    db.add(student)
+    db.commit()
+    return student
+
+
+def test_financial_honors_period(db, student):
+    """Paid/unpaid sums are restricted to the report period."""
+    db.add_all([
+        Payment(student_id=student.id, amount=100.0, date=date(2024, 1, 10), status="paid"),
+        Payment(student_id=student.id, amount=50.0, date=date(2024, 1, 20), status="unpaid"),
+        Payment(student_id=student.id, amount=999.0, date=date(2024, 3, 1), status="paid"),
+    ])
+    db.commit()
+
+    stats = ReportMetricsService.compute(db, "financial", date(2024, 1, 1), date(2024, 1, 31))
+    assert stats == {"total_revenue": 100.0, "outstanding_balances": 50.0, "recovery_rate_percent": 66.7}
+    assert ReportMetricsService.compute(db, "financial")["total_revenue"] == 1099.0
+
+
+def test_attendance_and_performance(db, student):
+    """Attendance rate and average score come from single aggregates."""
+    db.add_all([
+        Attendance(student_id=student.id, date=date(2024, 1, 1), status="present"),
+        Attendance(student_id=student.id, date=date(2024, 1, 2), status="absent"),
+        Attendance(student_id=student.id, date=date(2024, 1, 3), status="present"),
+        Attendance(student_id=student.id, date=date(2024, 1, 4), status="late"),
+    ])
+    course = Course(name="Math", group_id=student.group_id)
+    db.add(course)
+    db.commit()
+    january = Exam(course_id=course.id, group_id=student.group_id, exam_date=date(2024, 1, 15), max_score=20)
+    june = Exam(course_id=course.id, group_id=student.group_id, exam_date=date(2024, 6, 15), max_score=20)
+    db.add_all([january, june])
+    db.commit()
+    db.add_all([
+        ExamResult(exam_id=january.id, student_id=student.id, score=12.0),
+        ExamResult(exam_id=june.id, student_id=student.id, score=18.0),
+    ])
+    db.commit()
+
+    assert ReportMetricsService.compute(db, "attendance_analysis") == {
+        "attendance_records": 4, "present_rate_percent": 50.0,
+    }
+    assert ReportMetricsService.compute(db, "student_performance") == {"avg_score": 15.0, "results_count": 2}
+    assert ReportMetricsService.compute(db, "student_performance", period_end=date(2024, 3, 1)) == {
+        "avg_score": 12.0, "results_count": 1,
+    }
+    assert ReportMetricsService.compute(db, "academic") == {"note": "Basic report generated"}
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.models.models import Report
+from app.services.report_summary import ReportSummaryService
+
+
+def test_summary_counts_and_cache(db, monkeypatch):
+    """The summary is computed in one query, cached, and refreshed on invalidation."""
+    monkeypatch.setattr(settings, "REPORT_SUMMARY_TTL_SECONDS", 60)
+    ReportSummaryService.invalidate()
+    db.add_all([
+        Report(type="financial", file_path="a.pdf", created_at=datetime.now() - timedelta(days=2)),
+        Report(type="financial", file_path=None, created_at=datetime.now()),
+    ])
+    db.commit()
+
+    assert ReportSummaryService.get(db) == {
+        "totalReports": 2, "generatedToday": 1, "pendingReports": 1, "downloadCount": 6,
+    }
+
+    db.add(Report(type="academic", file_path="b.pdf", created_at=datetime.now()))
+    db.commit()
+    assert ReportSummaryService.get(db)["totalReports"] == 2  # served from cache
+
+    ReportSummaryService.invalidate()
+    assert ReportSummaryService.get(db)["totalReports"] == 3
+    ReportSummaryService.invalidate()
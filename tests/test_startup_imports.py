@@ -0,0 +1,12 @@
+import os
+import subprocess
+import sys
+
+
+def test_app_import_does_not_load_pdf_stack():
+    """ReportLab and matplotlib load on first render, not in every worker at startup."""
+    probe = "import sys, app.main; print(sorted(m for m in ('reportlab', 'matplotlib') if m in sys.modules))"
+    env = {**os.environ, "DATABASE_URL": "postgresql+psycopg2://test@localhost/test"}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", probe], cwd=root, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,84 @@
+import io
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from app.models.models import Admin, Group, Student, Subscription, SubscriptionPlan, UsageMetrics
+from app.services.student_import import StudentImportService
+
+
+@pytest.fixture
+def subscribed_admin(db):
+    admin = Admin(username="owner", hashed_password="x")
+    plan = SubscriptionPlan(name="Small", price=10.0, billing_interval="monthly", features=[], max_students=5)
+    db.add_all([admin, plan])
+    db.commit()
+    db.add(Subscription(admin_id=admin.id, plan_id=plan.id, status="active",
+                        start_date=date(2024, 1, 1), end_date=date(2030, 1, 1)))
+    db.commit()
+    return admin
+
+
+def _csv(text):
+    return io.BytesIO(text.encode())
+
+
+def test_import_records_one_usage_row(db, subscribed_admin):
+    """Valid rows are bulk-inserted and counted with a single usage row."""
+    group = Group(name="G1")
+    db.add(group)
+    db.commit()
+    imported = StudentImportService.import_csv(db, subscribed_admin.id, _csv(
+        "full_name,group_id,email,status\n"
+        f"Alice,{group.id},alice@example.com,\n"
+        "Bob,,,inactive\n"
+    ))
+
+    assert imported == 2
+    students = {s.full_name: s for s in db.query(Student).all()}
+    assert students["Alice"].group_id == group.id and students["Alice"].status == "active"
+    assert students["Bob"].status == "inactive"
+    usage = db.query(UsageMetrics).all()
+    assert [(u.metric_type, u.quantity) for u in usage] == [("students", 2)]
+
+
+def test_import_rejects_invalid_rows(db, subscribed_admin):
+    """Any invalid row aborts the whole import and is reported by line."""
+    with pytest.raises(HTTPException) as exc_info:
+        StudentImportService.import_csv(db, subscribed_admin.id, _csv(
+            "full_name,group_id\nAlice,\n,\nCarol,999\n"
+        ))
+
+    assert exc_info.value.status_code == 422
+    assert [e["line"] for e in exc_info.value.detail["errors"]] == [3, 4]
+    assert db.query(Student).count() == 0
+
+
+def test_import_checks_plan_limit_once(db, subscribed_admin):
+    """A batch exceeding the plan limit is refused before anything is inserted."""
+    rows = "".join(f"Student {i}\n" for i in range(6))
+    with pytest.raises(HTTPException) as exc_info:
+        StudentImportService.import_csv(db, subscribed_admin.id, _csv("full_name\n" + rows))
+
+    assert exc_info.value.status_code == 400
+    assert db.query(Student).count() == 0
+    assert db.query(UsageMetrics).count() == 0
+
+
+def test_import_rejects_non_utf8(db, subscribed_admin):
+    """A file in another encoding is a client error, not a server crash."""
+    with pytest.raises(HTTPException) as exc_info:
+        StudentImportService.import_csv(db, subscribed_admin.id, io.BytesIO("full_name\nJosé\n".encode("latin-1")))
+
+    assert exc_info.value.status_code == 400
+    assert db.query(Student).count() == 0
+
+
+def test_import_rolls_back_chunks_written_before_an_error(db, subscribed_admin, monkeypatch):
+    """Chunks already inserted are rolled back when a later chunk is invalid."""
+    monkeypatch.setattr("app.services.student_import.IMPORT_CHUNK_SIZE", 2)
+    with pytest.raises(HTTPException) as exc_info:
+        StudentImportService.import_csv(db, subscribed_admin.id, _csv("full_name,group_id\nA,\nB,\nC,999\n"))
+
+    assert exc_info.value.status_code == 422
+    assert db.query(Student).count() == 0
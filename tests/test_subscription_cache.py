@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from app.models.models import Admin, Subscription, SubscriptionPlan
+from app.services.subscription_cache import get_active_subscription, invalidate_subscription_cache
+
+
+@pytest.fixture
+def subscription(db):
+    admin = Admin(username="owner", hashed_password="x")
+    plan = SubscriptionPlan(name="Small", price=10.0, billing_interval="monthly", features=[], max_students=3)
+    db.add_all([admin, plan])
+    db.commit()
+    subscription = Subscription(admin_id=admin.id, plan_id=plan.id, status="active",
+                                start_date=date(2024, 1, 1), end_date=date(2030, 1, 1))
+    db.add(subscription)
+    db.commit()
+    return subscription
+
+
+def _count_queries(db, fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_lookup_is_cached_until_invalidated(db, subscription):
+    """The subscription and plan are queried once, then served from cache."""
+    admin_id, subscription_id = subscription.admin_id, subscription.id
+    (sub, plan), queries = _count_queries(db, lambda: get_active_subscription(db, admin_id))
+    assert (sub.id, plan.max_students) == (subscription_id, 3)
+    assert queries == 1
+
+    db.info.clear()  # a new request
+    (sub, plan), queries = _count_queries(db, lambda: get_active_subscription(db, admin_id))
+    assert (sub.id, plan.max_students) == (subscription_id, 3)
+    assert queries == 0
+
+    plan_row = db.get(SubscriptionPlan, plan.id)
+    plan_row.max_students = 10
+    db.commit()
+    invalidate_subscription_cache(admin_id)
+    db.info.clear()
+    _, plan = get_active_subscription(db, admin_id)
+    assert plan.max_students == 10
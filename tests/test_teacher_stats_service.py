@@ -0,0 +1,128 @@
+import pytest
+from app.models.models import Teacher, Course, Feedback, TeacherStatistics
+from app.services.teacher_stats_service import TeacherStatsService
+
+
+@pytest.fixture
+def teacher_course(db):
+    teacher = Teacher(full_name="Ms. Smith")
+    db.add(teacher)
+    db.commit()
+    course = Course(name="Math", teacher_id=teacher.id)
+    db.add(course)
+    db.commit()
+    return teacher, course
+
+
+def _submit(db, teacher, course, **scores):
+    feedback = Feedback(course_id=course.id, teacher_id=teacher.id, **scores)
+    db.add(feedback)
+    db.flush()
+    TeacherStatsService.apply_feedback_delta(db, teacher.id, None, TeacherStatsService.feedback_metrics(feedback))
+    db.commit()
+    return feedback
+
+
+def _stats(db, teacher):
+    db.expire_all()
+    return db.query(TeacherStatistics).filter(TeacherStatistics.teacher_id == teacher.id).one()
+
+
+def test_feedback_deltas_match_full_recompute(db, teacher_course):
+    """Insert, update and delete deltas keep the same averages as a full recompute."""
+    teacher, course = teacher_course
+    first = _submit(db, teacher, course, rating=4, satisfaction_score=8, teaching_quality=5)
+    second = _submit(db, teacher, course, rating=2, satisfaction_score=6, teaching_quality=3, helpfulness=4)
+
+    previous = TeacherStatsService.feedback_metrics(second)
+    second.rating = 5
+    db.flush()
+    TeacherStatsService.apply_feedback_delta(db, teacher.id, previous, TeacherStatsService.feedback_metrics(second))
+    db.commit()
+
+    stats = _stats(db, teacher)
+    assert stats.total_feedback_count == 2
+    assert stats.average_rating == pytest.approx(4.5)
+    assert stats.satisfaction_score == pytest.approx(70.0)
+    assert stats.grade_improvement == pytest.approx(80.0)
+    assert stats.helpfulness_rating == pytest.approx(4.0)
+    incremental = {c: getattr(stats, c) for c in ("average_rating", "satisfaction_score", "teaching_quality",
+                                                    "grade_improvement", "helpfulness_rating", "total_feedback_count")}
+
+    TeacherStatsService.update_teacher_statistics(db, teacher.id)
+    stats = _stats(db, teacher)
+    assert {c: getattr(stats, c) for c in incremental} == pytest.approx(incremental)
+
+    previous = TeacherStatsService.feedback_metrics(first)
+    db.delete(first)
+    db.flush()
+    TeacherStatsService.apply_feedback_delta(db, teacher.id, previous, None)
+    db.commit()
+
+    stats = _stats(db, teacher)
+    assert stats.total_feedback_count == 1
+    assert stats.average_rating == pytest.approx(5.0)
+    assert stats.helpfulness_rating == pytest.approx(4.0)
+
+
+def test_rows_without_running_sums_are_recomputed(db, teacher_course):
+    """Statistics rows created before the running sums existed are rebuilt on the next delta."""
+    teacher, course = teacher_course
+    db.add(TeacherStatistics(teacher_id=teacher.id, average_rating=1.0, total_feedback_count=7))
+    db.commit()
+
+    _submit(db, teacher, course, rating=3)
+
+    stats = _stats(db, teacher)
+    assert stats.total_feedback_count == 1
+    assert stats.average_rating == pytest.approx(3.0)
+    assert stats.rating_sum == pytest.approx(3.0)
+
+
+def test_update_all_teacher_statistics_bulk(db, teacher_course):
+    """The set-based recompute writes one row per teacher and reports progress."""
+    from app.models.models import Group, Student
+
+    teacher, course = teacher_course
+    idle = Teacher(full_name="Mr. Idle")
+    group = Group(name="G1")
+    db.add_all([idle, group])
+    db.commit()
+    course.group_id = group.id
+    db.add_all([Student(full_name="A", group_id=group.id), Student(full_name="B", group_id=group.id)])
+    db.add(Feedback(course_id=course.id, teacher_id=teacher.id, rating=4, satisfaction_score=9))
+    db.add(TeacherStatistics(teacher_id=teacher.id, total_feedback_count=99))
+    db.commit()
+
+    progress = []
+    assert TeacherStatsService.update_all_teacher_statistics(
+        db, progress=lambda done, total: progress.append((done, total)), batch_size=1
+    ) == 2
+    assert progress == [(1, 2), (2, 2)]
+
+    stats = _stats(db, teacher)
+    assert (stats.total_students, stats.total_subjects, stats.total_feedback_count) == (2, 1, 1)
+    assert stats.average_rating == pytest.approx(4.0)
+    assert stats.satisfaction_score == pytest.approx(90.0)
+    idle_stats = _stats(db, idle)
+    assert (idle_stats.total_students, idle_stats.total_feedback_count, idle_stats.average_rating) == (0, 0, 0.0)
+
+
+def test_first_feedback_race_folds_into_existing_row(db, teacher_course, monkeypatch):
+    """A statistics row created concurrently is kept and this feedback is added to it."""
+    teacher, course = teacher_course
+    seed_row = TeacherStatsService._statistics_row
+
+    def created_concurrently(db, teacher_id):
+        # Another request seeded the row from feedback that does not include ours yet
+        row = seed_row(db, teacher_id)
+        competing = {**row, 'rating_sum': 0.0, 'total_feedback_count': 0, 'average_rating': 0.0}
+        db.execute(TeacherStatistics.__table__.insert().values(**competing))
+        return row
+
+    monkeypatch.setattr(TeacherStatsService, "_statistics_row", staticmethod(created_concurrently))
+    _submit(db, teacher, course, rating=4)
+
+    stats = _stats(db, teacher)
+    assert stats.total_feedback_count == 1
+    assert stats.average_rating == pytest.approx(4.0)
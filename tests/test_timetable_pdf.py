@@ -0,0 +1,31 @@
+from app.utils.pdf_generator import _timetable_grid, generate_all_timetables_pdf
+
+
+def test_timetable_grid_places_sessions_by_day_and_hour():
+    """Sessions land in their (day, start hour) slot and span their duration."""
+    rows = [
+        {"day": 1, "start": "10:00", "end": "12:00", "course": "Math"},
+        {"day": 1, "start": "08:00", "end": "09:00", "course": "French"},
+        {"day": 0, "start": "21:00", "end": "23:00", "course": "Late"},
+        {"day": 2, "start": "09:00", "end": "09:45", "course": "Short"},
+    ]
+    grid = _timetable_grid(rows)
+    header, monday, tuesday, sunday = grid[0], grid[1], grid[2], grid[7]
+
+    assert all(len(row) == len(header) for row in grid)
+    assert monday[1:6] == ["French", "", "Math", "", ""]
+    assert tuesday[2] == "Short"
+    assert sunday[-1] == "Late"
+
+
+def test_generate_all_timetables_pdf(tmp_path):
+    """All groups are rendered into a single file."""
+    path = generate_all_timetables_pdf(
+        [
+            {"group_name": "G1", "rows": [{"day": 1, "start": "08:00", "end": "10:00", "course": "Math"}]},
+            {"group_name": "G2", "rows": []},
+        ],
+        filepath=str(tmp_path / "all.pdf"),
+    )
+    with open(path, "rb") as f:
+        assert f.read(4) == b"%PDF"
@@ -0,0 +1,38 @@
+from app.config import settings
+from app.services.timetable_pdf_cache import TimetablePdfCache
+from app.utils import pdf_generator
+
+ROWS = [{"day": 1, "start": "08:00", "end": "10:00", "course": "Math"}]
+
+
+def test_key_changes_with_content():
+    """The cache key is derived from the rendered content."""
+    assert TimetablePdfCache.key("G1", ROWS) == TimetablePdfCache.key("G1", list(ROWS))
+    assert TimetablePdfCache.key("G1", ROWS) != TimetablePdfCache.key("G2", ROWS)
+
+
+def test_get_or_create_reuses_file_and_invalidates(tmp_path, monkeypatch):
+    """A PDF is generated once per key and removed on invalidation."""
+    monkeypatch.setattr(type(settings), "TIMETABLE_CACHE_DIR", property(lambda self: str(tmp_path)))
+    calls = []
+
+    def fake_generate(group_name, rows, filepath=None):
+        calls.append(group_name)
+        with open(filepath, "wb") as f:
+            f.write(b"%PDF-1.4")
+        return filepath
+
+    monkeypatch.setattr(pdf_generator, "generate_group_timetable_pdf", fake_generate)
+
+    key = TimetablePdfCache.key("G1", ROWS)
+    first = TimetablePdfCache.get_or_create(7, "G1", ROWS, key)
+    second = TimetablePdfCache.get_or_create(7, "G1", ROWS, key)
+    assert first == second
+    assert len(calls) == 1
+
+    changed = [dict(ROWS[0], course="Physics")]
+    newer = TimetablePdfCache.get_or_create(7, "G1", changed, TimetablePdfCache.key("G1", changed))
+    assert sorted(p.name for p in tmp_path.iterdir()) == [newer.rsplit("/", 1)[-1]]
+
+    TimetablePdfCache.invalidate(7)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,54 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from app.models.models import Admin, Subscription, SubscriptionPlan, UsageCounter, UsageMetrics
+from app.services.usage import UsageService
+
+
+@pytest.fixture
+def subscription(db):
+    admin = Admin(username="owner", hashed_password="x")
+    plan = SubscriptionPlan(name="Small", price=10.0, billing_interval="monthly", features=[], max_students=3)
+    db.add_all([admin, plan])
+    db.commit()
+    subscription = Subscription(admin_id=admin.id, plan_id=plan.id, status="active",
+                                start_date=date(2024, 1, 1), end_date=date(2030, 1, 1))
+    db.add(subscription)
+    db.commit()
+    return subscription
+
+
+def _counter(db, subscription):
+    db.expire_all()
+    return db.query(UsageCounter).filter(UsageCounter.subscription_id == subscription.id).one()
+
+
+def test_counter_is_seeded_and_enforces_limit(db, subscription):
+    """The counter starts from recorded history and refuses increments past the limit."""
+    db.add(UsageMetrics(subscription_id=subscription.id, metric_type="students", quantity=1))
+    db.commit()
+
+    UsageService.reserve_usage(db, subscription.admin_id, "students", quantity=2)
+    db.commit()
+    assert _counter(db, subscription).value == 3
+
+    with pytest.raises(HTTPException) as exc_info:
+        UsageService.reserve_usage(db, subscription.admin_id, "students")
+    assert exc_info.value.status_code == 400
+    db.rollback()
+    assert _counter(db, subscription).value == 3
+
+
+def test_counter_restarts_on_new_period(db, subscription):
+    """A counter from a previous billing period is reset before use."""
+    db.add(UsageCounter(subscription_id=subscription.id, metric_type="students", value=3, period_start=None))
+    subscription.current_period_start = datetime.utcnow() - timedelta(days=1)
+    subscription.current_period_end = datetime.utcnow() + timedelta(days=29)
+    db.commit()
+
+    UsageService.reserve_usage(db, subscription.admin_id, "students")
+    db.commit()
+    counter = _counter(db, subscription)
+    assert counter.value == 1
+    assert counter.period_start == subscription.current_period_start